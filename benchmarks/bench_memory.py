@@ -0,0 +1,225 @@
+"""Benchmark bytes per channel: channel records under packed keys vs. the
+previous layout of tuple-keyed dicts holding dataclasses, lists, sets and
+eagerly built name indexes.
+
+The previous layout is rebuilt from the same channels, with a boxed int per
+distinct ID and channel, so both sides hold the same logical state.
+
+Run from the repository root:
+    python benchmarks/bench_memory.py [channels]
+"""
+import os
+import random
+import sys
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import InitiativeManager, NameIndex, SessionLog, seed_random, unpack_key  # noqa: E402
+from models.session_log import DEFAULT_SESSION_LOG_EVENTS  # noqa: E402
+
+# Snowflake-sized IDs, so every ID is a full boxed int rather than a cached small one
+SNOWFLAKE_BASE = 1 << 60
+
+CHANNELS_PER_GUILD = 10
+
+
+class LegacyIndexedSet:
+    """The participant set before IDs were packed: a list plus a position map."""
+
+    __slots__ = ("_items", "_positions")
+
+    def __init__(self, items):
+        self._items = list(items)
+        self._positions = {item: position for position, item in enumerate(self._items)}
+
+
+@dataclass
+class LegacyInitiative:
+    """The Initiative before slots and shared empty containers."""
+    current_player_id: Optional[int]
+    participants: LegacyIndexedSet
+    history: List[int]
+    version: int
+    weights: Dict[int, float]
+    sides: Dict[int, str]
+    turn_policy: str
+    _side_members: dict
+    _side_weights: dict
+    _samplers: dict
+    undo_depth: int
+    _undo_log: deque
+    _round_pending: bool
+    session_log: SessionLog
+
+
+def pool_only(manager: InitiativeManager, guild_id: int, channel_id: int, players: List[int]) -> None:
+    for player_id in players[:3]:
+        manager.add_to_pool(guild_id, channel_id, player_id, f"player{player_id % 1000}")
+
+
+def idle_initiative(manager: InitiativeManager, guild_id: int, channel_id: int, players: List[int]) -> None:
+    pool_only(manager, guild_id, channel_id, players)
+    manager.get_initiative(guild_id, channel_id)
+
+
+def ended_round(manager: InitiativeManager, guild_id: int, channel_id: int, players: List[int]) -> None:
+    active_round(manager, guild_id, channel_id, players)
+    manager.clear_initiative(guild_id, channel_id)
+
+
+def active_round(manager: InitiativeManager, guild_id: int, channel_id: int, players: List[int]) -> None:
+    for player_id in players[:5]:
+        manager.add_to_pool(guild_id, channel_id, player_id, f"player{player_id % 1000}")
+    manager.initialize_initiative_from_pool(guild_id, channel_id)
+    initiative = manager.get_initiative(guild_id, channel_id)
+    initiative.set_current_player(initiative.select_random_participant())
+    initiative.set_current_player(initiative.select_random_participant())
+
+
+SCENARIOS = (
+    ("pool only", pool_only),
+    ("idle initiative", idle_initiative),
+    ("ended round", ended_round),
+    ("active round", active_round),
+)
+
+
+def build_current(channels: int, scenario: Callable) -> InitiativeManager:
+    """Build a manager with every channel in the scenario's state."""
+    seed_random(42)
+    rng = random.Random(42)
+    manager = InitiativeManager()
+    for index in range(channels):
+        guild_id = SNOWFLAKE_BASE + index // CHANNELS_PER_GUILD
+        channel_id = SNOWFLAKE_BASE + index
+        players = [SNOWFLAKE_BASE + rng.randrange(1 << 40) for _ in range(5)]
+        scenario(manager, guild_id, channel_id, players)
+    return manager
+
+
+class LegacyBuilder:
+    """Rebuilds a manager's state in the previous layout."""
+
+    def __init__(self):
+        self._ints: Dict[int, int] = {}
+        self._containers: Dict[int, object] = {}
+
+    def box(self, value):
+        """A boxed int per distinct value within a channel, as the old layout shared them."""
+        if value is None:
+            return None
+        boxed = self._ints.get(value)
+        if boxed is None:
+            boxed = self._ints[value] = value + 0
+        return boxed
+
+    def participants(self, members) -> LegacyIndexedSet:
+        converted = self._containers.get(id(members))
+        if converted is None:
+            converted = self._containers[id(members)] = LegacyIndexedSet(self.box(item) for item in members)
+        return converted
+
+    def history(self, history) -> List[int]:
+        converted = self._containers.get(id(history))
+        if converted is None:
+            converted = self._containers[id(history)] = [self.box(item) for item in history]
+        return converted
+
+    def op(self, op: tuple) -> tuple:
+        if op[0] == "round":
+            return (op[0], self.participants(op[1]), self.history(op[2]), self.box(op[3]))
+        if op[0] == "counters":
+            return tuple(list(op))
+        return (op[0], self.box(op[1]))
+
+    def names(self, index: NameIndex) -> NameIndex:
+        # Fresh strings, as each index held its own; the previous index kept
+        # its search keys from the start
+        converted = NameIndex.from_names(
+            (self.box(player_id), name.encode().decode()) for player_id, name in index._names.items()
+        )
+        converted._keys = sorted((name.casefold(), player_id) for player_id, name in converted._names.items())
+        return converted
+
+    def session_log(self, session_log: SessionLog) -> SessionLog:
+        converted = SessionLog(session_log.max_events)
+        converted.round_number = session_log.round_number
+        converted.turn_number = session_log.turn_number
+        converted._events = [event[:4] + (self.box(event[4]),) for event in session_log.iter_events()]
+        return converted
+
+    def initiative(self, initiative) -> LegacyInitiative:
+        undo_log = deque(
+            ([self.op(op) for op in step] for step in initiative._undo_log),
+            maxlen=max(0, initiative.undo_depth)
+        )
+        return LegacyInitiative(
+            current_player_id=self.box(initiative.current_player_id),
+            participants=self.participants(initiative.participants),
+            history=self.history(initiative.history),
+            version=initiative.version + 0,
+            weights={self.box(player_id): weight for player_id, weight in initiative.weights.items()},
+            sides={self.box(player_id): side for player_id, side in initiative.sides.items()},
+            turn_policy=initiative.turn_policy,
+            _side_members={
+                side: self.participants(members) for side, members in initiative._side_members.items()
+            },
+            _side_weights=dict(initiative._side_weights),
+            _samplers={},
+            undo_depth=initiative.undo_depth,
+            _undo_log=undo_log,
+            _round_pending=initiative._round_pending,
+            session_log=self.session_log(initiative.session_log),
+        )
+
+    def build(self, manager: InitiativeManager) -> dict:
+        layout = {
+            "_initiatives": {}, "_player_pools": {}, "_name_indexes": {}, "_pool_versions": {},
+            "_guild_channels": {},
+        }
+        for key, state in manager._channels.items():
+            self._ints.clear()
+            self._containers.clear()
+            guild_id, channel_id = (self.box(part) for part in unpack_key(key))
+            layout["_guild_channels"].setdefault(guild_id, set()).add(channel_id)
+            # Each dict got its own key tuple from a separate get_key() call
+            if state.initiative is not None:
+                layout["_initiatives"][(guild_id, channel_id)] = self.initiative(state.initiative)
+            if state.pool is not None:
+                layout["_player_pools"][(guild_id, channel_id)] = {self.box(player_id) for player_id in state.pool}
+            if state.names is not None:
+                layout["_name_indexes"][(guild_id, channel_id)] = self.names(state.names)
+            if state.pool_version:
+                layout["_pool_versions"][(guild_id, channel_id)] = state.pool_version + 0
+        return layout
+
+
+def measure(build: Callable[[], object]):
+    """Bytes retained by whatever build() returns."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained, result
+
+
+def main() -> None:
+    channels = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{channels} channels, {CHANNELS_PER_GUILD} per guild, "
+          f"session logs of up to {DEFAULT_SESSION_LOG_EVENTS} events")
+    print(f"{'scenario':<16} {'before B/ch':>12} {'after B/ch':>11} {'saved':>7}")
+    for label, scenario in SCENARIOS:
+        after, manager = measure(lambda: build_current(channels, scenario))
+        before, legacy = measure(lambda: LegacyBuilder().build(manager))
+        print(f"{label:<16} {before / channels:>12.0f} {after / channels:>11.0f} "
+              f"{(1 - after / before) * 100:>6.1f}%")
+        del manager, legacy
+
+
+if __name__ == "__main__":
+    main()
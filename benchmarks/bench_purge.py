@@ -0,0 +1,79 @@
+"""Benchmark bulk purge of guild state via the guild index vs. a full key scan.
+
+Both sides do the same cleanup (channel records, thread parents, roster
+bindings and rosters, voice links and running stats); they differ only in
+how the guild's channels are found.
+
+Run from the repository root:
+    python benchmarks/bench_purge.py [guilds] [channels_per_guild]
+"""
+import os
+import sys
+import time
+from itertools import chain
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import InitiativeManager, unpack_key  # noqa: E402
+
+
+def populate(guilds: int, channels: int) -> InitiativeManager:
+    """
+    Build a manager with a pool and initiative in every guild/channel, plus
+    a roster-bound channel, a voice-linked channel and a thread per guild.
+    """
+    manager = InitiativeManager()
+    for guild_id in range(1, guilds + 1):
+        base = guild_id * 1_000_000
+        for channel_id in range(base, base + channels):
+            manager.add_to_pool(guild_id, channel_id, guild_id)
+            manager.get_initiative(guild_id, channel_id)
+        manager.bind_roster(guild_id, base, "party")
+        manager.link_voice(guild_id, base + 1, base + 999_999)
+        manager.register_thread(guild_id, base + 999_998, base + 1)
+    return manager
+
+
+def purge_by_scan(manager: InitiativeManager, guild_id: int) -> int:
+    """
+    Baseline: find the guild's channels and rosters by scanning every key,
+    then clean each up the way purge_guild does.
+    """
+    keys = chain(
+        manager._channels, manager._thread_parents, manager._roster_bindings,
+        manager._voice_links, manager._voice_followers,
+    )
+    channel_ids = {channel_id for key_guild, channel_id in map(unpack_key, keys) if key_guild == guild_id}
+    for channel_id in channel_ids:
+        manager._drop_channel_state(guild_id, channel_id)
+    for roster in [roster for roster in manager._rosters if roster[0] == guild_id]:
+        manager._drop_roster(roster)
+    manager._guild_channels.pop(guild_id, None)
+    manager._guild_rosters.pop(guild_id, None)
+    return len(channel_ids)
+
+
+def bench(label: str, purge, manager: InitiativeManager, guild_ids) -> None:
+    start = time.perf_counter()
+    purged = sum(purge(manager, guild_id) for guild_id in guild_ids)
+    elapsed = time.perf_counter() - start
+    per_guild_us = elapsed / len(guild_ids) * 1e6
+    print(f"{label:<12} purged {purged:>7} channels in {elapsed * 1e3:8.2f} ms "
+          f"({per_guild_us:8.1f} us/guild)")
+
+
+def main() -> None:
+    guilds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    channels = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    targets = list(range(1, guilds + 1, max(1, guilds // 100)))
+    print(f"{guilds} guilds x {channels} channels, purging {len(targets)} guilds")
+
+    manager = populate(guilds, channels)
+    bench("full scan", purge_by_scan, manager, targets)
+
+    manager = populate(guilds, channels)
+    bench("guild index", InitiativeManager.purge_guild, manager, targets)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark undo: per-turn delta log vs. a full copy of the state per turn.
+
+Run from the repository root:
+    python benchmarks/bench_undo.py [depth]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import IndexedSet, Initiative, seed_random  # noqa: E402
+
+
+def play_turns(initiative: Initiative, turns: int) -> None:
+    for _ in range(turns):
+        initiative.set_current_player(initiative.select_random_participant())
+
+
+def measure_delta_log(size: int, depth: int):
+    """Retained bytes per snapshot and undo latency of the Initiative undo log."""
+    seed_random(42)
+    initiative = Initiative(undo_depth=depth)
+    initiative.set_participants(range(size))
+    initiative.set_current_player(initiative.select_random_participant())
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    play_turns(initiative, depth)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    undone = initiative.rewind(depth)
+    per_undo_us = (time.perf_counter() - start) / undone * 1e6
+    return retained / depth, per_undo_us
+
+
+def measure_full_copy(size: int, depth: int):
+    """Baseline: snapshot current player, participants and history every turn."""
+    seed_random(42)
+    initiative = Initiative(undo_depth=0)
+    initiative.set_participants(range(size))
+    initiative.set_current_player(initiative.select_random_participant())
+    snapshots = []
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(depth):
+        snapshots.append((
+            initiative.current_player_id,
+            IndexedSet(initiative.participants),
+            list(initiative.history),
+        ))
+        play_turns(initiative, 1)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(depth):
+        current_player_id, participants, history = snapshots.pop()
+        initiative.current_player_id = current_player_id
+        initiative.participants = participants
+        initiative.history = history
+        initiative._reindex_participants()
+    per_undo_us = (time.perf_counter() - start) / depth * 1e6
+    return retained / depth, per_undo_us
+
+
+def main() -> None:
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"undo depth {depth}")
+    print(f"{'participants':>12} {'delta B/turn':>13} {'copy B/turn':>12} "
+          f"{'delta undo us':>14} {'copy undo us':>13}")
+    for size in (100, 1_000, 10_000, 100_000):
+        delta_bytes, delta_us = measure_delta_log(size, depth)
+        copy_bytes, copy_us = measure_full_copy(size, depth)
+        print(f"{size:>12} {delta_bytes:>13.0f} {copy_bytes:>12.0f} "
+              f"{delta_us:>14.2f} {copy_us:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark weighted draws: alias table vs. a naive cumulative-sum scan.
+
+Run from the repository root:
+    python benchmarks/bench_weighted.py [draws]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import AliasTable, Initiative  # noqa: E402
+
+
+def cumulative_scan(rng: random.Random, items, weights, total: float):
+    """Baseline: walk the running sum until it passes a uniform target."""
+    target = rng.random() * total
+    running = 0.0
+    for item, weight in zip(items, weights):
+        running += weight
+        if running > target:
+            return item
+    return items[-1]
+
+
+def bench(label: str, draw, draws: int) -> float:
+    start = time.perf_counter()
+    for _ in range(draws):
+        draw()
+    per_draw_us = (time.perf_counter() - start) / draws * 1e6
+    print(f"  {label:<28} {per_draw_us:10.3f} us/draw")
+    return per_draw_us
+
+
+def main() -> None:
+    draws = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(42)
+    for size in (100, 1_000, 10_000, 100_000):
+        items = list(range(size))
+        weights = [rng.choice((0.5, 1.0, 1.0, 2.0, 5.0)) for _ in items]
+        total = sum(weights)
+        print(f"pool of {size} participants")
+
+        start = time.perf_counter()
+        table = AliasTable(items, weights)
+        print(f"  {'alias table build':<28} {(time.perf_counter() - start) * 1e3:10.3f} ms")
+
+        naive = bench("cumulative-sum scan", lambda: cumulative_scan(rng, items, weights, total), draws)
+        alias = bench("alias table draw", lambda: table.sample(rng), draws)
+
+        # Full turn path: draws as participants leave, including lazy rebuilds
+        initiative = Initiative(weights=dict(zip(items, weights)))
+        initiative.set_participants(items)
+        turns = min(draws, size)
+        start = time.perf_counter()
+        for _ in range(turns):
+            initiative.set_current_player(initiative.select_random_participant())
+        per_turn_us = (time.perf_counter() - start) / turns * 1e6
+        print(f"  {'Initiative turn (amortized)':<28} {per_turn_us:10.3f} us/turn")
+        print(f"  alias speedup: {naive / alias:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
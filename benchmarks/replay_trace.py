@@ -0,0 +1,304 @@
+"""Replay recorded /popcorn interaction traces against the real command handlers.
+
+Traces are written by monitoring.TraceRecorder when TRACE_FILE is set. The
+replayer drives the handlers in commands/popcorn.py through a fake
+interaction layer, reports handler latency distributions, and checks that
+each channel reaches the same state digest as in the recorded run.
+
+Only traces in the current TRACE_FORMAT can be verified; older ones are
+refused unless --latency-only skips the state checks.
+
+Run from the repository root:
+    python benchmarks/replay_trace.py TRACE [TRACE ...] [--pace original|fast] [--speed N] [--latency-only]
+
+Pass rotated files oldest first (e.g. popcorn.trace.jsonl.2.gz
+popcorn.trace.jsonl.1.gz popcorn.trace.jsonl).
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config refuses to import without a token; the replayer never connects to Discord
+os.environ.setdefault("DISCORD_BOT_TOKEN", "offline-replay-placeholder-token")
+
+from config import GM_ROLE_NAME  # noqa: E402
+from models import InitiativeManager, reset_random, seed_random  # noqa: E402
+from monitoring import TRACE_FORMAT  # noqa: E402
+from commands import (  # noqa: E402
+    PoolGroup,
+    RosterGroup,
+    SideGroup,
+    VoiceGroup,
+    VoicePresenceSync,
+    popcorn_add,
+    popcorn_start,
+    popcorn_next,
+    popcorn_weight,
+    popcorn_end,
+    popcorn_undo,
+    popcorn_rewind,
+    popcorn_clear,
+    popcorn_status,
+    popcorn_export,
+)
+
+
+# Fake interaction layer
+class FakeRole:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class FakeMember:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.mention = f"<@{user_id}>"
+        self.display_name = str(user_id)
+        self.bot = False
+        self.roles: List[FakeRole] = []
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.filesize_limit = 25 * 1024 * 1024
+        self._members: Dict[int, FakeMember] = {}
+
+    def get_member(self, user_id: int) -> FakeMember:
+        member = self._members.get(user_id)
+        if member is None:
+            member = self._members[user_id] = FakeMember(user_id)
+        return member
+
+    async def fetch_member(self, user_id: int) -> FakeMember:
+        return self.get_member(user_id)
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+
+
+class FakeVoiceChannel:
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.mention = f"<#{channel_id}>"
+        # Members present at link time are replayed from their "voice join" events
+        self.members: List[FakeMember] = []
+
+
+class FakeResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content: Optional[str] = None, **kwargs) -> None:
+        if self._done:
+            raise RuntimeError("interaction already responded to")
+        self._done = True
+        self._interaction.messages.append(content)
+
+    async def defer(self, **kwargs) -> None:
+        if self._done:
+            raise RuntimeError("interaction already responded to")
+        self._done = True
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> None:
+        self._interaction.messages.append(content)
+
+
+class FakeInteraction:
+    def __init__(self, guild: FakeGuild, channel_id: int, user: FakeMember, interaction_id: int):
+        self.id = interaction_id
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel = FakeChannel(channel_id)
+        self.channel_id = channel_id
+        self.user = user
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.messages: List[Optional[str]] = []
+
+    async def delete_original_response(self) -> None:
+        pass
+
+
+def read_events(paths: List[str]) -> Iterator[dict]:
+    """Yield trace events from plain or gzip-compressed trace files in order."""
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+async def _apply(func, *args) -> None:
+    """Replay a state change that was not a slash command."""
+    func(*args)
+
+
+def build_dispatch(manager: InitiativeManager):
+    """Map trace command names to handler invocations."""
+    pool_group = PoolGroup(None, manager)
+    side_group = SideGroup(None, manager)
+    roster_group = RosterGroup(None, manager)
+    voice_group = VoiceGroup(None, manager, VoicePresenceSync(manager))
+    return {
+        "pool add": lambda i, o: pool_group.pool_add.callback(pool_group, i, o["user"]),
+        "pool remove": lambda i, o: pool_group.pool_remove.callback(pool_group, i, o["user"]),
+        "pool list": lambda i, o: pool_group.pool_list.callback(pool_group, i),
+        "pool clear": lambda i, o: pool_group.pool_clear.callback(pool_group, i),
+        "roster bind": lambda i, o: roster_group.roster_bind.callback(roster_group, i, o["name"]),
+        "roster unbind": lambda i, o: roster_group.roster_unbind.callback(roster_group, i),
+        "roster list": lambda i, o: roster_group.roster_list.callback(roster_group, i),
+        "voice link": lambda i, o: voice_group.voice_link.callback(
+            voice_group, i, FakeVoiceChannel(int(o["channel"]))
+        ),
+        "voice unlink": lambda i, o: voice_group.voice_unlink.callback(voice_group, i),
+        "voice join": lambda i, o: _apply(
+            manager.voice_member_joined, i.guild_id, i.channel_id, int(o["user"]), o.get("name")
+        ),
+        "voice leave": lambda i, o: _apply(
+            manager.voice_member_left, i.guild_id, i.channel_id, int(o["user"])
+        ),
+        "side assign": lambda i, o: side_group.side_assign.callback(side_group, i, o["user"], o["side"]),
+        "side unassign": lambda i, o: side_group.side_unassign.callback(side_group, i, o["user"]),
+        "side policy": lambda i, o: side_group.side_policy.callback(side_group, i, o["policy"]),
+        "side list": lambda i, o: side_group.side_list.callback(side_group, i),
+        "add": lambda i, o: popcorn_add(i, o["user"], manager),
+        "start": lambda i, o: popcorn_start(i, o.get("user"), manager),
+        "next": lambda i, o: popcorn_next(i, o.get("user"), manager),
+        "weight": lambda i, o: popcorn_weight(i, o["user"], o["weight"], manager),
+        "end": lambda i, o: popcorn_end(i, manager),
+        "undo": lambda i, o: popcorn_undo(i, manager),
+        "rewind": lambda i, o: popcorn_rewind(i, o["turns"], manager),
+        "clear": lambda i, o: popcorn_clear(i, manager),
+        "status": lambda i, o: popcorn_status(i, manager),
+        "export": lambda i, o: popcorn_export(i, o["export_format"], manager),
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def replay(paths: List[str], pace: str, speed: float, verify: bool = True) -> int:
+    manager = InitiativeManager()
+    dispatch = build_dispatch(manager)
+    guilds: Dict[int, FakeGuild] = {}
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    recorded: Dict[str, List[float]] = defaultdict(list)
+    final_digests: Dict[tuple, tuple] = {}
+    mismatches = 0
+    first_mismatch = None
+    events = 0
+
+    first_ts = None
+    wall_start = time.perf_counter()
+    for event in read_events(paths):
+        trace_format = event.get("f", 1)
+        if verify and trace_format != TRACE_FORMAT:
+            print(f"Event {events + 1} was recorded in trace format {trace_format}, but this "
+                  f"version replays format {TRACE_FORMAT}, so its states cannot be reproduced. "
+                  f"Re-record the trace, or pass --latency-only to replay it without state checks.")
+            return 2
+        command = event["cmd"]
+        handler = dispatch.get(command)
+        if handler is None:
+            print(f"skipping unknown command {command!r}")
+            continue
+
+        if pace == "original":
+            if first_ts is None:
+                first_ts = event["ts"]
+            delay = (event["ts"] - first_ts) / speed - (time.perf_counter() - wall_start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        guild = guilds.get(event["g"])
+        if guild is None:
+            guild = guilds[event["g"]] = FakeGuild(event["g"])
+        user = guild.get_member(event["u"])
+        user.roles = [FakeRole(GM_ROLE_NAME)] if event["mgr"] else []
+        if event.get("p"):
+            manager.register_thread(event["g"], event["c"], event["p"])
+
+        events += 1
+        interaction = FakeInteraction(guild, event["c"], user, events)
+        token = seed_random(event["seed"])
+        start = time.perf_counter()
+        try:
+            await handler(interaction, event["opts"])
+        finally:
+            reset_random(token)
+        latencies[command].append((time.perf_counter() - start) * 1000)
+        recorded[command].append(event["ms"])
+        if not verify:
+            continue
+
+        digest = manager.state_digest(event["g"], event["c"])
+        final_digests[(event["g"], event["c"])] = (digest, event["d"])
+        if digest != event["d"]:
+            mismatches += 1
+            if first_mismatch is None:
+                first_mismatch = (events, command, event["g"], event["c"])
+
+    elapsed = time.perf_counter() - wall_start
+    print(f"Replayed {events} events in {elapsed:.2f}s ({pace} pace)")
+    print(f"{'command':<12} {'count':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+          f"{'max ms':>9} {'rec p50':>9} {'rec p99':>9}")
+    for command in sorted(latencies):
+        values = sorted(latencies[command])
+        rec = sorted(recorded[command])
+        print(f"{command:<12} {len(values):>7} {percentile(values, 50):>9.3f} "
+              f"{percentile(values, 90):>9.3f} {percentile(values, 99):>9.3f} "
+              f"{values[-1]:>9.3f} {percentile(rec, 50):>9.3f} {percentile(rec, 99):>9.3f}")
+
+    if not verify:
+        print("State checks skipped (--latency-only)")
+        return 0
+    diverged = sum(1 for digest, expected in final_digests.values() if digest != expected)
+    print(f"Channels: {len(final_digests)}, final state mismatches: {diverged}, "
+          f"per-event mismatches: {mismatches}")
+    if first_mismatch:
+        print("First divergence at event {} ({}) in guild {} channel {}".format(*first_mismatch))
+    return 1 if diverged else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("traces", nargs="+", help="Trace files, oldest first")
+    parser.add_argument("--pace", choices=["original", "fast"], default="fast",
+                        help="Replay at the recorded pacing or as fast as possible")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Speed-up factor for original pacing")
+    parser.add_argument("--latency-only", action="store_true",
+                        help="Replay traces of an older format, skipping the state checks")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(replay(args.traces, args.pace, args.speed, verify=not args.latency_only)))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,16 +8,49 @@ import sys
 import os
 import asyncio
 
-from config import BOT_TOKEN
+from config import (
+    BOT_TOKEN,
+    TRACE_FILE,
+    TRACE_MAX_BYTES,
+    TRACE_BACKUP_COUNT,
+    HTTP_HOST,
+    HTTP_PORT,
+    ADMIN_TOKEN,
+    WATCHDOG_INTERVAL,
+    WATCHDOG_LAG_THRESHOLD,
+    UNDO_DEPTH,
+    SESSION_LOG_EVENTS,
+    DEDUP_WINDOW,
+    DEDUP_MAX_ENTRIES,
+    VOICE_HOLD_DOWN,
+    STATUS_FEED_POLL_INTERVAL,
+    STATUS_ALLOWED_ORIGINS,
+    PROFILE_INTERVAL,
+    PROFILE_DIR,
+)
 from models import InitiativeManager
+from helpers import EXPORT_FORMATS, InteractionDeduplicator, DUPLICATE_FINGERPRINT
+from monitoring import TraceRecorder, StatsCollector, LoopWatchdog, SamplingProfiler, get_recorder, set_recorder
+from web import LocalHTTPServer, StatusFeed, setup_admin_routes, setup_health_routes, setup_status_routes
 from commands import (
+    AdminGroup,
     PoolGroup,
+    RosterGroup,
+    SideGroup,
+    VoiceGroup,
+    VoicePresenceSync,
     popcorn_add,
     popcorn_start,
     popcorn_next,
+    popcorn_weight,
     popcorn_end,
+    popcorn_undo,
+    popcorn_rewind,
     popcorn_clear,
     popcorn_status,
+    popcorn_export,
+    pool_member_autocomplete,
+    remaining_participant_autocomplete,
 )
 
 
@@ -37,6 +70,37 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class PopcornCommandTree(app_commands.CommandTree):
+    """
+    Command tree that records thread parents before any command or
+    autocomplete runs, and drops duplicate command interactions.
+    """
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        channel = interaction.channel
+        if isinstance(channel, discord.Thread) and interaction.guild is not None and channel.parent_id:
+            self.client.initiative_manager.register_thread(
+                interaction.guild.id, channel.id, channel.parent_id
+            )
+        
+        if interaction.type != discord.InteractionType.application_command:
+            return True
+        reason = self.client.deduplicator.check(interaction)
+        if reason is None:
+            return True
+        # A redelivered ID may name a command that is no longer registered
+        command = interaction.command
+        name = command.qualified_name if command is not None else (interaction.data or {}).get("name", "?")
+        logger.info(f"Suppressed duplicate /{name} ({reason}) from {interaction.user.id}")
+        if reason == DUPLICATE_FINGERPRINT and not interaction.response.is_done():
+            # A redelivered interaction ID was already answered; a double tap still needs a reply
+            await interaction.response.send_message(
+                f"⏳ Ignored a repeated `/{name}`; it already ran.",
+                ephemeral=True
+            )
+        return False
+
+
 class PopcornBot(commands.Bot):
     """PopcornBot instance."""
     
@@ -49,14 +113,33 @@ class PopcornBot(commands.Bot):
         super().__init__(
             command_prefix='!',
             intents=intents,
+            tree_cls=PopcornCommandTree,
             description="A Discord bot for managing Popcorn Initiative in TTRPGs"
         )
         
-        self.initiative_manager = InitiativeManager()
+        self.initiative_manager = InitiativeManager(UNDO_DEPTH, SESSION_LOG_EVENTS)
+        self.deduplicator = InteractionDeduplicator(
+            self.initiative_manager, DEDUP_WINDOW, DEDUP_MAX_ENTRIES
+        )
+        self.voice_sync = VoicePresenceSync(self.initiative_manager, VOICE_HOLD_DOWN)
+        self.stats_collector = StatsCollector(self.initiative_manager, deduplicator=self.deduplicator)
+        self.http_server: Optional[LocalHTTPServer] = None
+        self.status_feed = StatusFeed(self.initiative_manager, STATUS_FEED_POLL_INTERVAL)
+        self.watchdog = LoopWatchdog(WATCHDOG_INTERVAL, WATCHDOG_LAG_THRESHOLD)
+        self.profiler = SamplingProfiler(PROFILE_INTERVAL, PROFILE_DIR)
+        self.commands_loaded = False
     
     async def setup_hook(self):
         """Called when the bot is starting up."""
         logger.info("Setting up bot...")
+        self.watchdog.start()
+        
+        # Optional interaction trace recording for offline replay
+        if TRACE_FILE:
+            set_recorder(TraceRecorder(
+                self.initiative_manager, TRACE_FILE, TRACE_MAX_BYTES, TRACE_BACKUP_COUNT
+            ))
+            logger.info(f"Recording interaction traces to {TRACE_FILE}")
         
         # Create main popcorn command group
         popcorn_group = app_commands.Group(name="popcorn", description="Popcorn Initiative commands")
@@ -65,26 +148,80 @@ class PopcornBot(commands.Bot):
         pool_group = PoolGroup(self, self.initiative_manager)
         popcorn_group.add_command(pool_group)
         
+        # Register shared roster subcommand group
+        roster_group = RosterGroup(self, self.initiative_manager)
+        popcorn_group.add_command(roster_group)
+        
+        # Register voice sync subcommand group
+        voice_group = VoiceGroup(self, self.initiative_manager, self.voice_sync)
+        popcorn_group.add_command(voice_group)
+        
+        # Register side subcommand group
+        side_group = SideGroup(self, self.initiative_manager)
+        popcorn_group.add_command(side_group)
+        
+        # Register admin diagnostics subcommand group
+        admin_group = AdminGroup(self, self.stats_collector, self.profiler)
+        popcorn_group.add_command(admin_group)
+        
         # Register initiative commands as subcommands
         @popcorn_group.command(name="add", description="Add user to pool and initiative")
         @app_commands.describe(user="The user to add")
         async def popcorn_add_cmd(interaction: discord.Interaction, user: discord.Member):
             await popcorn_add(interaction, user, self.initiative_manager)
         
+        # The user option of start/next is a string so it can be autocompleted
+        # from the channel's name index; the value is the chosen player's ID
         @popcorn_group.command(name="start", description="Start the initiative")
-        @app_commands.describe(user="Optional: The user to start with")
-        async def popcorn_start_cmd(interaction: discord.Interaction, user: Optional[discord.Member] = None):
+        @app_commands.describe(user="Optional: The pool member to start with")
+        async def popcorn_start_cmd(interaction: discord.Interaction, user: Optional[str] = None):
             await popcorn_start(interaction, user, self.initiative_manager)
         
+        @popcorn_start_cmd.autocomplete("user")
+        async def popcorn_start_user_autocomplete(interaction: discord.Interaction, current: str):
+            return await pool_member_autocomplete(interaction, current, self.initiative_manager)
+        
         @popcorn_group.command(name="next", description="Pass turn to next player")
-        @app_commands.describe(user="Optional: The user to pass to")
-        async def popcorn_next_cmd(interaction: discord.Interaction, user: Optional[discord.Member] = None):
+        @app_commands.describe(user="Optional: The remaining participant to pass to")
+        async def popcorn_next_cmd(interaction: discord.Interaction, user: Optional[str] = None):
             await popcorn_next(interaction, user, self.initiative_manager)
         
+        @popcorn_next_cmd.autocomplete("user")
+        async def popcorn_next_user_autocomplete(interaction: discord.Interaction, current: str):
+            return await remaining_participant_autocomplete(interaction, current, self.initiative_manager)
+        
+        @popcorn_group.command(name="weight", description="Set a player's selection weight")
+        @app_commands.describe(
+            user="The pool member to weight",
+            weight="Relative chance of being picked (1 is normal, 2 is twice as likely)"
+        )
+        async def popcorn_weight_cmd(
+            interaction: discord.Interaction,
+            user: str,
+            weight: app_commands.Range[float, 0.01, 100.0]
+        ):
+            await popcorn_weight(interaction, user, weight, self.initiative_manager)
+        
+        @popcorn_weight_cmd.autocomplete("user")
+        async def popcorn_weight_user_autocomplete(interaction: discord.Interaction, current: str):
+            return await pool_member_autocomplete(interaction, current, self.initiative_manager)
+        
         @popcorn_group.command(name="end", description="End the current initiative")
         async def popcorn_end_cmd(interaction: discord.Interaction):
             await popcorn_end(interaction, self.initiative_manager)
         
+        @popcorn_group.command(name="undo", description="Undo the last turn")
+        async def popcorn_undo_cmd(interaction: discord.Interaction):
+            await popcorn_undo(interaction, self.initiative_manager)
+        
+        @popcorn_group.command(name="rewind", description="Undo the last several turns")
+        @app_commands.describe(turns="Number of turns to undo")
+        async def popcorn_rewind_cmd(
+            interaction: discord.Interaction,
+            turns: app_commands.Range[int, 1, 100]
+        ):
+            await popcorn_rewind(interaction, turns, self.initiative_manager)
+        
         @popcorn_group.command(name="clear", description="Clear initiative brackets")
         async def popcorn_clear_cmd(interaction: discord.Interaction):
             await popcorn_clear(interaction, self.initiative_manager)
@@ -93,6 +230,12 @@ class PopcornBot(commands.Bot):
         async def popcorn_status_cmd(interaction: discord.Interaction):
             await popcorn_status(interaction, self.initiative_manager)
         
+        @popcorn_group.command(name="export", description="Export this channel's turn log")
+        @app_commands.describe(format="File format of the export")
+        @app_commands.choices(format=[app_commands.Choice(name=f, value=f) for f in EXPORT_FORMATS])
+        async def popcorn_export_cmd(interaction: discord.Interaction, format: str = "jsonl"):
+            await popcorn_export(interaction, format, self.initiative_manager)
+        
         # Add the popcorn group to the command tree
         self.tree.add_command(popcorn_group)
         
@@ -101,6 +244,41 @@ class PopcornBot(commands.Bot):
         logger.info(f"Commands in tree: {[cmd.name for cmd in self.tree.get_commands()]}")
         
         # Commands will be synced in on_ready() after bot is fully connected
+        
+        self.commands_loaded = True
+        
+        # Start local operator endpoints if configured
+        if HTTP_PORT:
+            self.http_server = LocalHTTPServer(HTTP_HOST, HTTP_PORT)
+            setup_health_routes(self.http_server, self.watchdog, self.readiness_checks)
+            if ADMIN_TOKEN:
+                setup_admin_routes(self.http_server, self.stats_collector, self.profiler, ADMIN_TOKEN)
+            else:
+                logger.info("ADMIN_TOKEN is not set; /admin HTTP endpoints are disabled")
+            setup_status_routes(self.http_server, self.status_feed, STATUS_ALLOWED_ORIGINS)
+            self.status_feed.start()
+            await self.http_server.start()
+    
+    def readiness_checks(self) -> dict:
+        """Checks that must all pass for the bot to be ready to serve commands."""
+        return {
+            "gateway_connected": self.is_ready() and not self.is_closed(),
+            "commands_loaded": self.commands_loaded,
+        }
+    
+    async def close(self):
+        """Stop local services before disconnecting."""
+        self.watchdog.stop()
+        self.voice_sync.stop()
+        self.status_feed.stop()
+        if self.http_server is not None:
+            await self.http_server.stop()
+        recorder = get_recorder()
+        if recorder is not None:
+            # Writes out the queued trace events; the listener thread is a daemon
+            set_recorder(None)
+            await asyncio.to_thread(recorder.close)
+        await super().close()
     
     async def on_ready(self):
         """Called when the bot is ready."""
@@ -135,6 +313,28 @@ class PopcornBot(commands.Bot):
             import traceback
             logger.error(traceback.format_exc())
     
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        """Remember the state a command left behind so a double tap is caught."""
+        self.deduplicator.complete(interaction)
+    
+    async def on_voice_state_update(self, member, before, after):
+        """Called when a member joins, leaves or moves between voice channels."""
+        self.voice_sync.on_voice_state_update(member, before, after)
+    
+    async def on_member_update(self, before, after):
+        """Called when a member's nickname, roles or other guild profile changes."""
+        if before.display_name != after.display_name:
+            self.initiative_manager.rename_member(after.guild.id, after.id, after.display_name)
+    
+    async def on_user_update(self, before, after):
+        """Called when a user's global name changes; members without a nickname show it."""
+        if before.display_name == after.display_name:
+            return
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member is not None:
+                self.initiative_manager.rename_member(guild.id, member.id, member.display_name)
+    
     async def on_guild_join(self, guild):
         """Called when the bot joins a guild."""
         logger.info(f"Joined guild: {guild.name} (ID: {guild.id})")
@@ -150,6 +350,18 @@ class PopcornBot(commands.Bot):
     async def on_guild_remove(self, guild):
         """Called when the bot is removed from a guild."""
         logger.info(f"Left guild: {guild.name} (ID: {guild.id})")
+        purged = self.initiative_manager.purge_guild(guild.id)
+        logger.info(f"Purged state for {purged} channel(s) of guild {guild.id}")
+    
+    async def on_guild_channel_delete(self, channel):
+        """Called when a guild channel is deleted."""
+        if self.initiative_manager.purge_channel(channel.guild.id, channel.id):
+            logger.info(f"Purged state for deleted channel {channel.id} in guild {channel.guild.id}")
+    
+    async def on_raw_thread_delete(self, payload):
+        """Called when a thread is deleted, whether or not it is cached."""
+        if self.initiative_manager.purge_channel(payload.guild_id, payload.thread_id):
+            logger.info(f"Purged state for deleted thread {payload.thread_id} in guild {payload.guild_id}")
 
 
 async def main():
@@ -1,21 +1,42 @@
 """Commands package."""
+from .admin import AdminGroup
+from .voice import VoiceGroup, VoicePresenceSync
 from .popcorn import (
     PoolGroup,
+    RosterGroup,
+    SideGroup,
     popcorn_add,
     popcorn_start,
     popcorn_next,
+    popcorn_weight,
     popcorn_end,
+    popcorn_undo,
+    popcorn_rewind,
     popcorn_clear,
     popcorn_status,
+    popcorn_export,
+    pool_member_autocomplete,
+    remaining_participant_autocomplete,
 )
 
 __all__ = [
+    "AdminGroup",
     "PoolGroup",
+    "RosterGroup",
+    "SideGroup",
+    "VoiceGroup",
+    "VoicePresenceSync",
     "popcorn_add",
     "popcorn_start",
     "popcorn_next",
+    "popcorn_weight",
     "popcorn_end",
+    "popcorn_undo",
+    "popcorn_rewind",
     "popcorn_clear",
     "popcorn_status",
+    "popcorn_export",
+    "pool_member_autocomplete",
+    "remaining_participant_autocomplete",
 ]
 
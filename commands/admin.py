@@ -0,0 +1,156 @@
+"""Bot-wide admin diagnostics commands."""
+import asyncio
+import io
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from helpers import Responder, is_bot_admin
+from monitoring import PROFILE_MAX_SECONDS, PROFILE_MODES, SamplingProfiler, StatsCollector
+
+# Discord rejects messages longer than this
+MAX_MESSAGE_LENGTH = 2000
+
+
+def format_stats(stats: dict, tracemalloc_lines=None) -> str:
+    """Render collected statistics as a compact code block."""
+    keys = stats["keys"]
+    lines = [
+        f"keys: channels={keys['channels']} initiatives={keys['initiatives']} pools={keys['player_pools']} "
+        f"name_indexes={keys['name_indexes']} guilds={keys['guilds']} threads={keys['threads']} "
+        f"rosters={keys['rosters']} roster_bindings={keys['roster_bindings']}",
+    ]
+    for label, name in (("pool size", "pool_size"), ("history size", "history_size")):
+        dist = stats[name]
+        lines.append(
+            f"{label}: p50={dist['p50']} p90={dist['p90']} p99={dist['p99']} max={dist['max']}"
+        )
+    lines.append("bytes: " + " ".join(f"{name}={size}" for name, size in stats["bytes"].items()))
+    if stats["largest_channels"]:
+        lines.append("largest channels:")
+        for entry in stats["largest_channels"]:
+            lines.append(f"  {entry['guild_id']}/{entry['channel_id']}: {entry['pool_size']} players")
+    dedup = stats.get("dedup")
+    if dedup is not None:
+        suppressed = " ".join(f"{reason}={count}" for reason, count in sorted(dedup["suppressed"].items()))
+        lines.append(f"dedup: checked={dedup['checked']} suppressed {suppressed or 'none'}")
+    responses = stats.get("responses")
+    if responses is not None:
+        deferred = " ".join(
+            f"{command}={count}/{responses['runs'].get(command, 0)}"
+            for command, count in sorted(responses["deferred"].items())
+        )
+        lines.append(f"deferred replies: {deferred or 'none'}")
+    lines.append(f"collected in {stats['collected_in_ms']} ms")
+    if tracemalloc_lines:
+        lines.append("tracemalloc:")
+        lines.extend(f"  {line}" for line in tracemalloc_lines)
+
+    body = "\n".join(lines)
+    limit = MAX_MESSAGE_LENGTH - len("📈 **Bot Stats**\n```\n\n```") - 4
+    if len(body) > limit:
+        body = body[:limit] + "\n..."
+    return f"📈 **Bot Stats**\n```\n{body}\n```"
+
+
+class AdminGroup(app_commands.Group):
+    """Bot-wide diagnostics, restricted to the bot owner and ADMIN_USER_IDS."""
+
+    def __init__(self, bot: commands.Bot, stats_collector: StatsCollector, profiler: SamplingProfiler):
+        super().__init__(name="admin", description="Bot diagnostics (bot admins only)")
+        self.bot = bot
+        self.stats_collector = stats_collector
+        self.profiler = profiler
+
+    @app_commands.command(name="stats", description="Show state sizes and memory footprint")
+    @app_commands.describe(
+        top="Number of largest channels to list",
+        tracemalloc="Also show a tracemalloc diff since the previous snapshot"
+    )
+    async def admin_stats(
+        self,
+        interaction: discord.Interaction,
+        top: app_commands.Range[int, 1, 25] = 5,
+        tracemalloc: bool = False
+    ):
+        """Show state sizes and memory footprint."""
+        reply = Responder(interaction, "admin stats")
+        try:
+            # The owner check may fetch application info and a tracemalloc
+            # snapshot can take seconds, so acknowledge before either
+            await reply.defer(ephemeral=True)
+            if not await is_bot_admin(interaction):
+                await reply.send(
+                    "❌ Only bot admins can use this command.",
+                    ephemeral=True
+                )
+                return
+
+            stats = await self.stats_collector.get_stats(top)
+            tracemalloc_lines = None
+            if tracemalloc:
+                tracemalloc_lines = await asyncio.to_thread(self.stats_collector.tracemalloc_diff)
+            await reply.send(
+                format_stats(stats, tracemalloc_lines),
+                ephemeral=True
+            )
+        except Exception as e:
+            await reply.send(
+                f"❌ An error occurred: {str(e)}", ephemeral=True
+            )
+
+    @app_commands.command(name="profile", description="Sample where the event loop spends its time")
+    @app_commands.describe(
+        seconds="How long to sample for",
+        mode="Profile the whole event loop or only /popcorn handlers"
+    )
+    @app_commands.choices(mode=[app_commands.Choice(name=mode, value=mode) for mode in PROFILE_MODES])
+    async def admin_profile(
+        self,
+        interaction: discord.Interaction,
+        seconds: app_commands.Range[int, 1, PROFILE_MAX_SECONDS] = 10,
+        mode: str = "loop"
+    ):
+        """Run the sampling profiler and post its top functions and collapsed stacks."""
+        reply = Responder(interaction, "admin profile")
+        try:
+            # The owner check may fetch application info and sampling
+            # outlasts the acknowledgement window, so acknowledge first
+            await reply.defer(ephemeral=True)
+            if not await is_bot_admin(interaction):
+                await reply.send(
+                    "❌ Only bot admins can use this command.",
+                    ephemeral=True
+                )
+                return
+            if self.profiler.is_running():
+                await reply.send(
+                    "❌ A profile is already running.",
+                    ephemeral=True
+                )
+                return
+
+            try:
+                result = await self.profiler.profile(seconds, mode)
+            except ValueError as e:
+                await reply.send(f"❌ {str(e)}", ephemeral=True)
+                return
+
+            header = "🔬 **Profile**"
+            if result.path:
+                header += f" (saved to `{result.path}`)"
+            body = result.summary()
+            limit = MAX_MESSAGE_LENGTH - len(f"{header}\n```\n\n```") - 4
+            if len(body) > limit:
+                body = body[:limit] + "\n..."
+
+            collapsed = "".join(result.iter_collapsed()).encode("utf-8")
+            limit_bytes = interaction.guild.filesize_limit if interaction.guild else 8 * 1024 * 1024
+            files = []
+            if collapsed and len(collapsed) <= limit_bytes:
+                filename = f"popcorn-profile-{mode}.collapsed"
+                files.append(discord.File(io.BytesIO(collapsed), filename=filename))
+            await reply.send(f"{header}\n```\n{body}\n```", files=files, ephemeral=True)
+        except Exception as e:
+            await reply.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
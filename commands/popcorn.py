@@ -2,10 +2,16 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import Optional
+from typing import List, Optional
 
-from models import InitiativeManager
-from helpers import validate_discord_user, has_manager_role, is_current_player_or_manager
+from models import Initiative, InitiativeManager, TURN_POLICIES
+from helpers import (
+    Responder,
+    has_manager_role,
+    is_current_player_or_manager,
+    build_session_export,
+)
+from monitoring import traced
 
 
 class PopcornGroup(app_commands.Group):
@@ -28,52 +34,57 @@ class PoolGroup(app_commands.Group):
 
     @app_commands.command(name="add", description="Add a user to the player pool")
     @app_commands.describe(user="The user to add to the pool")
+    @traced("pool add")
     async def pool_add(self, interaction: discord.Interaction, user: discord.Member):
         """Add a user to the player pool."""
+        reply = Responder(interaction, "pool add")
         try:
             # Check permissions
             if not has_manager_role(interaction.user):
-                await interaction.response.send_message(
+                await reply.send(
                     "❌ You need the GM or Popcorn Manager role to manage the player pool.",
                     ephemeral=True
                 )
                 return
 
             # Validate user
-            validated_member = await validate_discord_user(user, interaction.guild)
+            validated_member = await reply.resolve_member(user)
             
             # Add to pool
             self.initiative_manager.add_to_pool(
                 interaction.guild.id,
                 interaction.channel.id,
-                validated_member.id
+                validated_member.id,
+                validated_member.display_name
             )
             
-            await interaction.response.send_message(
+            await reply.send(
                 f"✅ {validated_member.mention} has been added to the player pool."
             )
         except ValueError as e:
-            await interaction.response.send_message(f"❌ {str(e)}", ephemeral=True)
+            await reply.send(f"❌ {str(e)}", ephemeral=True)
         except Exception as e:
-            await interaction.response.send_message(
+            await reply.send(
                 f"❌ An error occurred: {str(e)}", ephemeral=True
             )
 
     @app_commands.command(name="remove", description="Remove a user from the player pool")
     @app_commands.describe(user="The user to remove from the pool")
+    @traced("pool remove")
     async def pool_remove(self, interaction: discord.Interaction, user: discord.Member):
         """Remove a user from the player pool."""
+        reply = Responder(interaction, "pool remove")
         try:
             # Check permissions
             if not has_manager_role(interaction.user):
-                await interaction.response.send_message(
+                await reply.send(
                     "❌ You need the GM or Popcorn Manager role to manage the player pool.",
                     ephemeral=True
                 )
                 return
 
             # Validate user
-            validated_member = await validate_discord_user(user, interaction.guild)
+            validated_member = await reply.resolve_member(user)
             
             # Remove from pool
             self.initiative_manager.remove_from_pool(
@@ -82,23 +93,25 @@ class PoolGroup(app_commands.Group):
                 validated_member.id
             )
             
-            await interaction.response.send_message(
+            await reply.send(
                 f"✅ {validated_member.mention} has been removed from the player pool."
             )
         except ValueError as e:
-            await interaction.response.send_message(f"❌ {str(e)}", ephemeral=True)
+            await reply.send(f"❌ {str(e)}", ephemeral=True)
         except Exception as e:
-            await interaction.response.send_message(
+            await reply.send(
                 f"❌ An error occurred: {str(e)}", ephemeral=True
             )
 
     @app_commands.command(name="list", description="List all players in the pool")
+    @traced("pool list")
     async def pool_list(self, interaction: discord.Interaction):
         """List all players in the player pool."""
+        reply = Responder(interaction, "pool list")
         try:
             # Check permissions
             if not has_manager_role(interaction.user):
-                await interaction.response.send_message(
+                await reply.send(
                     "❌ You need the GM or Popcorn Manager role to view the player pool.",
                     ephemeral=True
                 )
@@ -110,7 +123,7 @@ class PoolGroup(app_commands.Group):
             )
             
             if not pool:
-                await interaction.response.send_message(
+                await reply.send(
                     "📋 The player pool is empty."
                 )
                 return
@@ -123,27 +136,29 @@ class PoolGroup(app_commands.Group):
                     player_mentions.append(member.mention)
             
             if not player_mentions:
-                await interaction.response.send_message(
+                await reply.send(
                     "📋 The player pool is empty (no valid members found)."
                 )
                 return
             
             player_list = "\n".join(f"• {mention}" for mention in player_mentions)
-            await interaction.response.send_message(
+            await reply.send(
                 f"📋 **Player Pool** ({len(player_mentions)} players):\n{player_list}"
             )
         except Exception as e:
-            await interaction.response.send_message(
+            await reply.send(
                 f"❌ An error occurred: {str(e)}", ephemeral=True
             )
 
     @app_commands.command(name="clear", description="Clear the entire player pool")
+    @traced("pool clear")
     async def pool_clear(self, interaction: discord.Interaction):
         """Clear the entire player pool."""
+        reply = Responder(interaction, "pool clear")
         try:
             # Check permissions
             if not has_manager_role(interaction.user):
-                await interaction.response.send_message(
+                await reply.send(
                     "❌ You need the GM or Popcorn Manager role to manage the player pool.",
                     ephemeral=True
                 )
@@ -154,39 +169,352 @@ class PoolGroup(app_commands.Group):
                 interaction.channel.id
             )
             
-            await interaction.response.send_message(
+            await reply.send(
                 "✅ The player pool has been cleared."
             )
         except Exception as e:
-            await interaction.response.send_message(
+            await reply.send(
+                f"❌ An error occurred: {str(e)}", ephemeral=True
+            )
+
+
+# Shared roster commands
+class RosterGroup(app_commands.Group):
+    """Guild-level shared roster commands."""
+    
+    def __init__(self, bot: commands.Bot, initiative_manager: InitiativeManager):
+        super().__init__(name="roster", description="Share one player pool across channels")
+        self.bot = bot
+        self.initiative_manager = initiative_manager
+
+    @app_commands.command(name="bind", description="Use a guild-wide shared roster as this channel's pool")
+    @app_commands.describe(name="The roster name; created from this channel's pool if it does not exist")
+    @traced("roster bind")
+    async def roster_bind(self, interaction: discord.Interaction, name: app_commands.Range[str, 1, 32]):
+        """Bind this channel to a shared roster."""
+        reply = Responder(interaction, "roster bind")
+        try:
+            # Check permissions
+            if not has_manager_role(interaction.user):
+                await reply.send(
+                    "❌ You need the GM or Popcorn Manager role to manage rosters.",
+                    ephemeral=True
+                )
+                return
+
+            roster_name = name.strip().lower()
+            if not roster_name:
+                raise ValueError("Roster name cannot be empty.")
+
+            player_count, discarded = self.initiative_manager.bind_roster(
+                interaction.guild.id,
+                interaction.channel.id,
+                roster_name
+            )
+            
+            message = (
+                f"🔗 This channel now uses the shared roster **{roster_name}** ({player_count} players). "
+                f"Pool changes here apply to every channel bound to it."
+            )
+            if discarded:
+                message += f"\n⚠️ This channel's own pool of {discarded} players was replaced by the roster."
+            await reply.send(message)
+        except ValueError as e:
+            await reply.send(f"❌ {str(e)}", ephemeral=True)
+        except Exception as e:
+            await reply.send(
+                f"❌ An error occurred: {str(e)}", ephemeral=True
+            )
+
+    @app_commands.command(name="unbind", description="Stop using the shared roster; keep a private copy")
+    @traced("roster unbind")
+    async def roster_unbind(self, interaction: discord.Interaction):
+        """Unbind this channel from its shared roster."""
+        reply = Responder(interaction, "roster unbind")
+        try:
+            # Check permissions
+            if not has_manager_role(interaction.user):
+                await reply.send(
+                    "❌ You need the GM or Popcorn Manager role to manage rosters.",
+                    ephemeral=True
+                )
+                return
+
+            roster_name = self.initiative_manager.get_roster_binding(
+                interaction.guild.id,
+                interaction.channel.id
+            )
+            if not self.initiative_manager.unbind_roster(interaction.guild.id, interaction.channel.id):
+                await reply.send(
+                    "❌ This channel is not bound to a shared roster.",
+                    ephemeral=True
+                )
+                return
+            
+            await reply.send(
+                f"✅ This channel no longer uses the roster **{roster_name}** and keeps a private copy of it."
+            )
+        except Exception as e:
+            await reply.send(
+                f"❌ An error occurred: {str(e)}", ephemeral=True
+            )
+
+    @app_commands.command(name="list", description="List the guild's shared rosters")
+    @traced("roster list")
+    async def roster_list(self, interaction: discord.Interaction):
+        """List the guild's shared rosters."""
+        reply = Responder(interaction, "roster list")
+        try:
+            # Check permissions
+            if not has_manager_role(interaction.user):
+                await reply.send(
+                    "❌ You need the GM or Popcorn Manager role to view rosters.",
+                    ephemeral=True
+                )
+                return
+
+            rosters = self.initiative_manager.list_rosters(interaction.guild.id)
+            if not rosters:
+                await reply.send(
+                    "📋 This server has no shared rosters."
+                )
+                return
+            
+            roster_lines = "\n".join(
+                f"• **{name}**: {player_count} players, {bound_count} channel(s)"
+                for name, player_count, bound_count in rosters[:25]
+            )
+            await reply.send(
+                f"📋 **Shared Rosters** ({len(rosters)}):\n{roster_lines}"
+            )
+        except Exception as e:
+            await reply.send(
+                f"❌ An error occurred: {str(e)}", ephemeral=True
+            )
+
+
+# Side management commands
+class SideGroup(app_commands.Group):
+    """Side (e.g. players vs. enemies) management commands."""
+    
+    def __init__(self, bot: commands.Bot, initiative_manager: InitiativeManager):
+        super().__init__(name="side", description="Manage sides and the turn policy")
+        self.bot = bot
+        self.initiative_manager = initiative_manager
+
+    @app_commands.command(name="assign", description="Assign a user to a side")
+    @app_commands.describe(user="The user to assign", side="The side name, e.g. players or enemies")
+    @traced("side assign")
+    async def side_assign(
+        self,
+        interaction: discord.Interaction,
+        user: discord.Member,
+        side: app_commands.Range[str, 1, 32]
+    ):
+        """Assign a user to a side."""
+        reply = Responder(interaction, "side assign")
+        try:
+            # Check permissions
+            if not has_manager_role(interaction.user):
+                await reply.send(
+                    "❌ You need the GM or Popcorn Manager role to manage sides.",
+                    ephemeral=True
+                )
+                return
+
+            # Validate user
+            validated_member = await reply.resolve_member(user)
+            side_name = side.strip().lower()
+            if not side_name:
+                raise ValueError("Side name cannot be empty.")
+
+            self.initiative_manager.set_side(
+                interaction.guild.id,
+                interaction.channel.id,
+                validated_member.id,
+                side_name
+            )
+            
+            await reply.send(
+                f"✅ {validated_member.mention} is now on side **{side_name}**."
+            )
+        except ValueError as e:
+            await reply.send(f"❌ {str(e)}", ephemeral=True)
+        except Exception as e:
+            await reply.send(
                 f"❌ An error occurred: {str(e)}", ephemeral=True
             )
 
+    @app_commands.command(name="unassign", description="Remove a user from their side")
+    @app_commands.describe(user="The user to unassign")
+    @traced("side unassign")
+    async def side_unassign(self, interaction: discord.Interaction, user: discord.Member):
+        """Remove a user from their side."""
+        reply = Responder(interaction, "side unassign")
+        try:
+            # Check permissions
+            if not has_manager_role(interaction.user):
+                await reply.send(
+                    "❌ You need the GM or Popcorn Manager role to manage sides.",
+                    ephemeral=True
+                )
+                return
+
+            # Validate user
+            validated_member = await reply.resolve_member(user)
+
+            self.initiative_manager.set_side(
+                interaction.guild.id,
+                interaction.channel.id,
+                validated_member.id,
+                None
+            )
+            
+            await reply.send(
+                f"✅ {validated_member.mention} is no longer on a side."
+            )
+        except ValueError as e:
+            await reply.send(f"❌ {str(e)}", ephemeral=True)
+        except Exception as e:
+            await reply.send(
+                f"❌ An error occurred: {str(e)}", ephemeral=True
+            )
+
+    @app_commands.command(name="policy", description="Set whether turns must alternate between sides")
+    @app_commands.describe(policy="any: any side may go next; alternate: the next player must be on another side")
+    @app_commands.choices(policy=[app_commands.Choice(name=p, value=p) for p in TURN_POLICIES])
+    @traced("side policy")
+    async def side_policy(self, interaction: discord.Interaction, policy: str):
+        """Set the turn policy."""
+        reply = Responder(interaction, "side policy")
+        try:
+            # Check permissions
+            if not has_manager_role(interaction.user):
+                await reply.send(
+                    "❌ You need the GM or Popcorn Manager role to manage sides.",
+                    ephemeral=True
+                )
+                return
+
+            self.initiative_manager.set_turn_policy(
+                interaction.guild.id,
+                interaction.channel.id,
+                policy
+            )
+            
+            await reply.send(
+                f"✅ Turn policy set to **{policy}**."
+            )
+        except ValueError as e:
+            await reply.send(f"❌ {str(e)}", ephemeral=True)
+        except Exception as e:
+            await reply.send(
+                f"❌ An error occurred: {str(e)}", ephemeral=True
+            )
+
+    @app_commands.command(name="list", description="List side assignments")
+    @traced("side list")
+    async def side_list(self, interaction: discord.Interaction):
+        """List side assignments."""
+        reply = Responder(interaction, "side list")
+        try:
+            initiative = self.initiative_manager.get_initiative(
+                interaction.guild.id,
+                interaction.channel.id
+            )
+            
+            if not initiative.sides:
+                await reply.send(
+                    f"⚔️ No sides assigned. Turn policy: **{initiative.turn_policy}**."
+                )
+                return
+            
+            # Group members by side
+            members_by_side = {}
+            for player_id, side in initiative.sides.items():
+                members_by_side.setdefault(side, []).append(player_id)
+            
+            lines = [f"⚔️ **Sides** (turn policy: **{initiative.turn_policy}**)"]
+            for side in sorted(members_by_side):
+                player_ids = members_by_side[side]
+                mentions = [f"<@{player_id}>" for player_id in player_ids[:10]]
+                if len(player_ids) > 10:
+                    mentions.append(f"... and {len(player_ids) - 10} more")
+                lines.append(f"**{side}** ({len(player_ids)}): {', '.join(mentions)}")
+            
+            await reply.send("\n".join(lines))
+        except Exception as e:
+            await reply.send(
+                f"❌ An error occurred: {str(e)}", ephemeral=True
+            )
+
+
+# Autocomplete callbacks
+def _to_choices(matches) -> List[app_commands.Choice[str]]:
+    """Convert (player_id, display_name) matches to autocomplete choices."""
+    return [
+        app_commands.Choice(name=display_name[:100], value=str(player_id))
+        for player_id, display_name in matches
+    ]
+
+
+async def pool_member_autocomplete(
+    interaction: discord.Interaction,
+    current: str,
+    initiative_manager: InitiativeManager
+) -> List[app_commands.Choice[str]]:
+    """Suggest pool members whose display name starts with the typed text."""
+    if interaction.guild is None or interaction.channel is None:
+        return []
+    return _to_choices(initiative_manager.search_pool(
+        interaction.guild.id,
+        interaction.channel.id,
+        current
+    ))
+
+
+async def remaining_participant_autocomplete(
+    interaction: discord.Interaction,
+    current: str,
+    initiative_manager: InitiativeManager
+) -> List[app_commands.Choice[str]]:
+    """Suggest remaining participants whose display name starts with the typed text."""
+    if interaction.guild is None or interaction.channel is None:
+        return []
+    return _to_choices(initiative_manager.search_participants(
+        interaction.guild.id,
+        interaction.channel.id,
+        current
+    ))
+
 
 # Initiative management commands
+@traced("add")
 async def popcorn_add(
     interaction: discord.Interaction,
     user: discord.Member,
     initiative_manager: InitiativeManager
 ):
     """Add a user to the pool and current initiative (if running)."""
+    reply = Responder(interaction, "add")
     try:
         # Check permissions
         if not has_manager_role(interaction.user):
-            await interaction.response.send_message(
+            await reply.send(
                 "❌ You need the GM or Popcorn Manager role to add players.",
                 ephemeral=True
             )
             return
 
         # Validate user
-        validated_member = await validate_discord_user(user, interaction.guild)
+        validated_member = await reply.resolve_member(user)
         
         # Add to pool
         initiative_manager.add_to_pool(
             interaction.guild.id,
             interaction.channel.id,
-            validated_member.id
+            validated_member.id,
+            validated_member.display_name
         )
         
         # Add to current initiative if running
@@ -195,32 +523,34 @@ async def popcorn_add(
             interaction.channel.id
         )
         if initiative.is_active():
-            initiative.add_to_participants(validated_member.id)
-            await interaction.response.send_message(
+            initiative.add_to_participants(validated_member.id, validated_member.display_name)
+            await reply.send(
                 f"✅ {validated_member.mention} has been added to the pool and current initiative."
             )
         else:
-            await interaction.response.send_message(
+            await reply.send(
                 f"✅ {validated_member.mention} has been added to the pool."
             )
     except ValueError as e:
-        await interaction.response.send_message(f"❌ {str(e)}", ephemeral=True)
+        await reply.send(f"❌ {str(e)}", ephemeral=True)
     except Exception as e:
-        await interaction.response.send_message(
+        await reply.send(
             f"❌ An error occurred: {str(e)}", ephemeral=True
         )
 
 
+@traced("start")
 async def popcorn_start(
     interaction: discord.Interaction,
-    user: Optional[discord.Member],
+    user: Optional[discord.Member | str],
     initiative_manager: InitiativeManager
 ):
     """Start the initiative."""
+    reply = Responder(interaction, "start")
     try:
         # Check permissions
         if not has_manager_role(interaction.user):
-            await interaction.response.send_message(
+            await reply.send(
                 "❌ You need the GM or Popcorn Manager role to start the initiative.",
                 ephemeral=True
             )
@@ -232,7 +562,7 @@ async def popcorn_start(
             interaction.channel.id
         )
         if initiative.is_active():
-            await interaction.response.send_message(
+            await reply.send(
                 "❌ An initiative is already running. Use `/popcorn end` to end it first.",
                 ephemeral=True
             )
@@ -244,7 +574,7 @@ async def popcorn_start(
             interaction.channel.id
         )
         if not pool:
-            await interaction.response.send_message(
+            await reply.send(
                 "❌ The player pool is empty. Add players to the pool first.",
                 ephemeral=True
             )
@@ -253,9 +583,9 @@ async def popcorn_start(
         # Validate user if provided
         first_player_id = None
         if user:
-            validated_member = await validate_discord_user(user, interaction.guild)
+            validated_member = await reply.resolve_member(user)
             if validated_member.id not in pool:
-                await interaction.response.send_message(
+                await reply.send(
                     f"❌ {validated_member.mention} is not in the player pool.",
                     ephemeral=True
                 )
@@ -270,7 +600,7 @@ async def popcorn_start(
         )
 
         if not selected_player_id:
-            await interaction.response.send_message(
+            await reply.send(
                 "❌ Failed to start initiative.",
                 ephemeral=True
             )
@@ -278,29 +608,31 @@ async def popcorn_start(
 
         selected_member = interaction.guild.get_member(selected_player_id)
         if selected_member:
-            await interaction.response.send_message(
+            await reply.send(
                 f"🎬 **Popcorn Initiative Started!**\n"
                 f"🎯 {selected_member.mention} goes first!"
             )
         else:
-            await interaction.response.send_message(
+            await reply.send(
                 f"🎬 **Popcorn Initiative Started!**\n"
                 f"🎯 Player ID {selected_player_id} goes first!"
             )
     except ValueError as e:
-        await interaction.response.send_message(f"❌ {str(e)}", ephemeral=True)
+        await reply.send(f"❌ {str(e)}", ephemeral=True)
     except Exception as e:
-        await interaction.response.send_message(
+        await reply.send(
             f"❌ An error occurred: {str(e)}", ephemeral=True
         )
 
 
+@traced("next")
 async def popcorn_next(
     interaction: discord.Interaction,
-    user: Optional[discord.Member],
+    user: Optional[discord.Member | str],
     initiative_manager: InitiativeManager
 ):
     """Pass the turn to the next player."""
+    reply = Responder(interaction, "next")
     try:
         initiative = initiative_manager.get_initiative(
             interaction.guild.id,
@@ -309,7 +641,7 @@ async def popcorn_next(
 
         # Check if initiative is active
         if not initiative.is_active():
-            await interaction.response.send_message(
+            await reply.send(
                 "❌ No active initiative. Use `/popcorn start` to start one.",
                 ephemeral=True
             )
@@ -327,12 +659,12 @@ async def popcorn_next(
             current_player_id = initiative.get_current_player()
             current_member = interaction.guild.get_member(current_player_id) if current_player_id else None
             if current_member:
-                await interaction.response.send_message(
+                await reply.send(
                     f"❌ Only {current_member.mention} (current player) or a GM/Popcorn Manager can use this command.",
                     ephemeral=True
                 )
             else:
-                await interaction.response.send_message(
+                await reply.send(
                     "❌ Only the current player or a GM/Popcorn Manager can use this command.",
                     ephemeral=True
                 )
@@ -346,7 +678,7 @@ async def popcorn_next(
 
         # If user specified
         if user:
-            validated_member = await validate_discord_user(user, interaction.guild)
+            validated_member = await reply.resolve_member(user)
             
             # If manager is using this and no participants left, start new initiative
             if has_manager_role(interaction.user) and not initiative.has_participants():
@@ -356,7 +688,8 @@ async def popcorn_next(
                     initiative_manager.add_to_pool(
                         interaction.guild.id,
                         interaction.channel.id,
-                        validated_member.id
+                        validated_member.id,
+                        validated_member.display_name
                     )
                 
                 initiative_manager.initialize_initiative_from_pool(
@@ -364,26 +697,24 @@ async def popcorn_next(
                     interaction.channel.id,
                     validated_member.id
                 )
-                await interaction.response.send_message(
+                await reply.send(
                     f"🔄 **New Initiative Started!**\n"
                     f"🎯 {validated_member.mention} goes first!"
                 )
                 return
             
-            # Check if user is in participants
-            if validated_member.id not in initiative.participants:
-                if validated_member.id in pool:
-                    initiative.add_to_participants(validated_member.id)
-                else:
-                    await interaction.response.send_message(
-                        f"❌ {validated_member.mention} is not in the player pool or initiative participants.",
-                        ephemeral=True
-                    )
-                    return
+            # Check if user is in participants or the pool; set_current_player
+            # moves them out of participants either way
+            if validated_member.id not in initiative.participants and validated_member.id not in pool:
+                await reply.send(
+                    f"❌ {validated_member.mention} is not in the player pool or initiative participants.",
+                    ephemeral=True
+                )
+                return
             
             # Pass to specified user
             initiative.set_current_player(validated_member.id)
-            await interaction.response.send_message(
+            await reply.send(
                 f"🎯 Turn passed to {validated_member.mention}!"
             )
             return
@@ -394,7 +725,7 @@ async def popcorn_next(
             if not pool:
                 # End initiative - pool is empty
                 initiative.reset()
-                await interaction.response.send_message(
+                await reply.send(
                     "🏁 **Initiative ended** - Player pool is exhausted."
                 )
                 return
@@ -409,18 +740,18 @@ async def popcorn_next(
             if new_first_player_id:
                 new_member = interaction.guild.get_member(new_first_player_id)
                 if new_member:
-                    await interaction.response.send_message(
+                    await reply.send(
                         f"🔄 **New Initiative Started!**\n"
                         f"🎯 {new_member.mention} goes first!"
                     )
                 else:
-                    await interaction.response.send_message(
+                    await reply.send(
                         f"🔄 **New Initiative Started!**\n"
                         f"🎯 Player ID {new_first_player_id} goes first!"
                     )
             else:
                 initiative.reset()
-                await interaction.response.send_message(
+                await reply.send(
                     "🏁 **Initiative ended** - Could not start new initiative."
                 )
             return
@@ -431,37 +762,78 @@ async def popcorn_next(
             initiative.set_current_player(next_player_id)
             next_member = interaction.guild.get_member(next_player_id)
             if next_member:
-                await interaction.response.send_message(
+                await reply.send(
                     f"🎯 Turn passed to {next_member.mention}!"
                 )
             else:
-                await interaction.response.send_message(
+                await reply.send(
                     f"🎯 Turn passed to Player ID {next_player_id}!"
                 )
         else:
             # This shouldn't happen, but handle it
             initiative.reset()
-            await interaction.response.send_message(
+            await reply.send(
                 "🏁 **Initiative ended** - No more participants."
             )
 
     except ValueError as e:
-        await interaction.response.send_message(f"❌ {str(e)}", ephemeral=True)
+        await reply.send(f"❌ {str(e)}", ephemeral=True)
     except Exception as e:
-        await interaction.response.send_message(
+        await reply.send(
             f"❌ An error occurred: {str(e)}", ephemeral=True
         )
 
 
+@traced("weight")
+async def popcorn_weight(
+    interaction: discord.Interaction,
+    user: discord.Member | str,
+    weight: float,
+    initiative_manager: InitiativeManager
+):
+    """Set how likely a player is to be picked by random turn selection."""
+    reply = Responder(interaction, "weight")
+    try:
+        # Check permissions
+        if not has_manager_role(interaction.user):
+            await reply.send(
+                "❌ You need the GM or Popcorn Manager role to set weights.",
+                ephemeral=True
+            )
+            return
+
+        # Validate user
+        validated_member = await reply.resolve_member(user)
+
+        initiative_manager.set_weight(
+            interaction.guild.id,
+            interaction.channel.id,
+            validated_member.id,
+            weight
+        )
+
+        await reply.send(
+            f"⚖️ {validated_member.mention} now has selection weight **{weight:g}**."
+        )
+    except ValueError as e:
+        await reply.send(f"❌ {str(e)}", ephemeral=True)
+    except Exception as e:
+        await reply.send(
+            f"❌ An error occurred: {str(e)}", ephemeral=True
+        )
+
+
+@traced("end")
 async def popcorn_end(
     interaction: discord.Interaction,
     initiative_manager: InitiativeManager
 ):
     """End the current initiative."""
+    reply = Responder(interaction, "end")
     try:
         # Check permissions
         if not has_manager_role(interaction.user):
-            await interaction.response.send_message(
+            await reply.send(
                 "❌ You need the GM or Popcorn Manager role to end the initiative.",
                 ephemeral=True
             )
@@ -473,31 +845,124 @@ async def popcorn_end(
         )
 
         if not initiative.is_active():
-            await interaction.response.send_message(
+            await reply.send(
                 "❌ No active initiative to end.",
                 ephemeral=True
             )
             return
 
         initiative.reset()
-        await interaction.response.send_message(
+        await reply.send(
             "🏁 **Initiative ended** by manager."
         )
     except Exception as e:
-        await interaction.response.send_message(
+        await reply.send(
+            f"❌ An error occurred: {str(e)}", ephemeral=True
+        )
+
+
+async def _send_rewind_result(reply: Responder, initiative: Initiative, undone: int):
+    """Report how many turns were undone and whose turn it is now."""
+    current_player_id = initiative.get_current_player()
+    if current_player_id is None:
+        turn_line = "No initiative is active."
+    else:
+        current_member = reply.interaction.guild.get_member(current_player_id)
+        mention = current_member.mention if current_member else f"Player ID {current_player_id}"
+        turn_line = f"🎯 It is {mention}'s turn."
+    await reply.send(
+        f"⏪ Undid {undone} turn{'s' if undone != 1 else ''}. {turn_line}"
+    )
+
+
+@traced("undo")
+async def popcorn_undo(
+    interaction: discord.Interaction,
+    initiative_manager: InitiativeManager
+):
+    """Undo the last turn."""
+    reply = Responder(interaction, "undo")
+    try:
+        # Check permissions
+        if not has_manager_role(interaction.user):
+            await reply.send(
+                "❌ You need the GM or Popcorn Manager role to undo turns.",
+                ephemeral=True
+            )
+            return
+
+        initiative = initiative_manager.get_initiative(
+            interaction.guild.id,
+            interaction.channel.id
+        )
+
+        if not initiative.undo():
+            await reply.send(
+                "❌ There are no turns to undo.",
+                ephemeral=True
+            )
+            return
+
+        await _send_rewind_result(reply, initiative, 1)
+    except Exception as e:
+        await reply.send(
             f"❌ An error occurred: {str(e)}", ephemeral=True
         )
 
 
+@traced("rewind")
+async def popcorn_rewind(
+    interaction: discord.Interaction,
+    turns: int,
+    initiative_manager: InitiativeManager
+):
+    """Undo the last several turns."""
+    reply = Responder(interaction, "rewind")
+    try:
+        # Check permissions
+        if not has_manager_role(interaction.user):
+            await reply.send(
+                "❌ You need the GM or Popcorn Manager role to undo turns.",
+                ephemeral=True
+            )
+            return
+
+        if turns < 1:
+            raise ValueError("Number of turns must be at least 1.")
+
+        initiative = initiative_manager.get_initiative(
+            interaction.guild.id,
+            interaction.channel.id
+        )
+
+        undone = initiative.rewind(turns)
+        if not undone:
+            await reply.send(
+                "❌ There are no turns to undo.",
+                ephemeral=True
+            )
+            return
+
+        await _send_rewind_result(reply, initiative, undone)
+    except ValueError as e:
+        await reply.send(f"❌ {str(e)}", ephemeral=True)
+    except Exception as e:
+        await reply.send(
+            f"❌ An error occurred: {str(e)}", ephemeral=True
+        )
+
+
+@traced("clear")
 async def popcorn_clear(
     interaction: discord.Interaction,
     initiative_manager: InitiativeManager
 ):
     """Clear initiative brackets."""
+    reply = Responder(interaction, "clear")
     try:
         # Check permissions
         if not has_manager_role(interaction.user):
-            await interaction.response.send_message(
+            await reply.send(
                 "❌ You need the GM or Popcorn Manager role to clear the initiative.",
                 ephemeral=True
             )
@@ -508,20 +973,22 @@ async def popcorn_clear(
             interaction.channel.id
         )
         
-        await interaction.response.send_message(
+        await reply.send(
             "✅ Initiative brackets have been cleared."
         )
     except Exception as e:
-        await interaction.response.send_message(
+        await reply.send(
             f"❌ An error occurred: {str(e)}", ephemeral=True
         )
 
 
+@traced("status")
 async def popcorn_status(
     interaction: discord.Interaction,
     initiative_manager: InitiativeManager
 ):
     """Show current initiative status."""
+    reply = Responder(interaction, "status")
     try:
         initiative = initiative_manager.get_initiative(
             interaction.guild.id,
@@ -545,10 +1012,39 @@ async def popcorn_status(
         if len(pool) > 10:
             pool_list.append(f"... and {len(pool) - 10} more")
         
+        # Threads show whether they share the parent channel's pool or have forked it
+        pool_source = ""
+        source = initiative_manager.get_pool_source(
+            interaction.guild.id,
+            interaction.channel.id
+        )
+        if source == "roster":
+            roster_name = initiative_manager.get_roster_binding(
+                interaction.guild.id,
+                interaction.channel.id
+            )
+            pool_source = f" (shared roster **{roster_name}**)"
+        elif source != "channel":
+            parent_id = initiative_manager.get_thread_parent(
+                interaction.guild.id,
+                interaction.channel.id
+            )
+            if source == "inherited":
+                pool_source = f" (inherited from <#{parent_id}>)"
+            else:
+                pool_source = f" (forked from <#{parent_id}>)"
+
         if pool_list:
-            status_parts.append(f"**Player Pool:** {pool_count} player(s)\n{', '.join(pool_list)}")
+            status_parts.append(f"**Player Pool:** {pool_count} player(s){pool_source}\n{', '.join(pool_list)}")
         else:
-            status_parts.append("**Player Pool:** Empty")
+            status_parts.append(f"**Player Pool:** Empty{pool_source}")
+
+        voice_channel_id = initiative_manager.get_voice_link(
+            interaction.guild.id,
+            interaction.channel.id
+        )
+        if voice_channel_id is not None:
+            status_parts.append(f"**Voice Sync:** following <#{voice_channel_id}>")
 
         # Initiative status
         if initiative.is_active():
@@ -578,14 +1074,90 @@ async def popcorn_status(
             
             if initiative.history:
                 status_parts.append(f"**Players Acted:** {len(initiative.history)}")
+            
+            if initiative.weights:
+                status_parts.append(f"**Weighted Players:** {len(initiative.weights)}")
+            
+            remaining_by_side = initiative.remaining_by_side()
+            if initiative.sides:
+                side_counts = ", ".join(
+                    f"{side or 'unassigned'}: {count}"
+                    for side, count in sorted(remaining_by_side.items(), key=lambda item: item[0] or "")
+                )
+                status_parts.append(
+                    f"**Sides:** turn policy {initiative.turn_policy}; remaining {side_counts or 'none'}"
+                )
         else:
             status_parts.append("\n**Initiative:** Not active")
 
-        await interaction.response.send_message(
+        await reply.send(
             "📊 **Popcorn Initiative Status**\n\n" + "\n".join(status_parts)
         )
     except Exception as e:
-        await interaction.response.send_message(
+        await reply.send(
             f"❌ An error occurred: {str(e)}", ephemeral=True
         )
 
+
+
+@traced("export")
+async def popcorn_export(
+    interaction: discord.Interaction,
+    export_format: str,
+    initiative_manager: InitiativeManager
+):
+    """Export the channel's turn log as a compressed file."""
+    reply = Responder(interaction, "export")
+    try:
+        initiative = initiative_manager.get_initiative(
+            interaction.guild.id,
+            interaction.channel.id
+        )
+        session_log = initiative.session_log
+        if not len(session_log):
+            await reply.send(
+                "❌ No turns have been logged in this channel yet.",
+                ephemeral=True
+            )
+            return
+
+        # Large logs can take longer to compress than the interaction deadline
+        await reply.defer(ephemeral=True)
+
+        name_index = initiative_manager.get_name_index(
+            interaction.guild.id,
+            interaction.channel.id
+        )
+
+        def name_lookup(player_id: int) -> Optional[str]:
+            name = name_index.get_name(player_id)
+            if name is None:
+                member = interaction.guild.get_member(player_id)
+                name = member.display_name if member else None
+            return name
+
+        export = await build_session_export(session_log, export_format, name_lookup)
+        size = export.getbuffer().nbytes
+        if size > interaction.guild.filesize_limit:
+            await reply.send(
+                f"❌ The export is {size // 1024} KiB, more than this server's upload limit.",
+                ephemeral=True
+            )
+            return
+
+        filename = f"popcorn-{interaction.guild.id}-{interaction.channel.id}.{export_format}.gz"
+        message = f"📜 Turn log: {len(session_log)} events."
+        if session_log.dropped:
+            message += (
+                f" The oldest {session_log.dropped} events were dropped to stay within the "
+                f"log limit and are not included."
+            )
+        await reply.send(
+            message,
+            file=discord.File(export, filename=filename),
+            ephemeral=True
+        )
+    except Exception as e:
+        await reply.send(
+            f"❌ An error occurred: {str(e)}", ephemeral=True
+        )
@@ -0,0 +1,171 @@
+"""Voice channel presence sync for player pools."""
+import asyncio
+from typing import Dict
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from models import InitiativeManager
+from helpers import Responder, has_manager_role
+from monitoring import traced, trace_state_change
+
+
+class VoicePresenceSync:
+    """
+    Keeps pools linked to a voice channel in sync with its members.
+
+    Pools are updated incrementally from voice state events: a join or leave
+    touches only the channels linked to that voice channel, so a round
+    starts from an up-to-date pool without scanning voice members. With a
+    ``hold_down`` delay, a leave is only applied if the member has not
+    rejoined by then, so flapping connections do not churn the pool.
+    """
+
+    def __init__(self, initiative_manager: InitiativeManager, hold_down: float = 0.0):
+        self.initiative_manager = initiative_manager
+        self.hold_down = hold_down
+        # Structure: {(guild_id, voice_channel_id, member_id): pending leave}
+        self._pending_leaves: Dict[tuple, asyncio.TimerHandle] = {}
+
+    def link(self, guild_id: int, channel_id: int, voice_channel: discord.VoiceChannel) -> int:
+        """
+        Link a channel's pool to a voice channel and add its current members.
+
+        This is the only full scan of voice members; later changes arrive
+        as events.
+
+        Returns:
+            int: Number of voice members added to the pool
+        """
+        self.initiative_manager.link_voice(guild_id, channel_id, voice_channel.id)
+        added = 0
+        for member in voice_channel.members:
+            if not member.bot:
+                self._apply_join(guild_id, channel_id, member)
+                added += 1
+        return added
+
+    def unlink(self, guild_id: int, channel_id: int) -> bool:
+        """Stop syncing a channel's pool. Returns True if it was linked."""
+        return self.initiative_manager.unlink_voice(guild_id, channel_id)
+
+    def on_voice_state_update(
+        self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState
+    ) -> None:
+        """Apply a member's voice channel change to linked pools."""
+        if member.bot or before.channel == after.channel:
+            # Mute, deafen and stream changes do not move anyone
+            return
+        guild_id = member.guild.id
+        if before.channel is not None:
+            self._member_left(guild_id, before.channel.id, member.id)
+        if after.channel is not None:
+            self._member_joined(guild_id, after.channel.id, member)
+
+    def _member_joined(self, guild_id: int, voice_channel_id: int, member: discord.Member) -> None:
+        pending = self._pending_leaves.pop((guild_id, voice_channel_id, member.id), None)
+        if pending is not None:
+            # Rejoined within the hold-down; the member never left the pools
+            pending.cancel()
+            return
+        for channel_id in self.initiative_manager.get_voice_followers(guild_id, voice_channel_id):
+            self._apply_join(guild_id, channel_id, member)
+
+    def _member_left(self, guild_id: int, voice_channel_id: int, member_id: int) -> None:
+        if not self.initiative_manager.get_voice_followers(guild_id, voice_channel_id):
+            return
+        if self.hold_down <= 0:
+            self._expire_leave(guild_id, voice_channel_id, member_id)
+            return
+        key = (guild_id, voice_channel_id, member_id)
+        if key not in self._pending_leaves:
+            self._pending_leaves[key] = asyncio.get_running_loop().call_later(
+                self.hold_down, self._expire_leave, guild_id, voice_channel_id, member_id
+            )
+
+    def _expire_leave(self, guild_id: int, voice_channel_id: int, member_id: int) -> None:
+        self._pending_leaves.pop((guild_id, voice_channel_id, member_id), None)
+        for channel_id in self.initiative_manager.get_voice_followers(guild_id, voice_channel_id):
+            self.initiative_manager.voice_member_left(guild_id, channel_id, member_id)
+            trace_state_change("voice leave", guild_id, channel_id, member_id, {"user": str(member_id)})
+
+    def _apply_join(self, guild_id: int, channel_id: int, member: discord.Member) -> None:
+        self.initiative_manager.voice_member_joined(guild_id, channel_id, member.id, member.display_name)
+        trace_state_change(
+            "voice join", guild_id, channel_id, member.id,
+            {"user": str(member.id), "name": member.display_name}
+        )
+
+    def stop(self) -> None:
+        """Cancel pending leaves."""
+        for handle in self._pending_leaves.values():
+            handle.cancel()
+        self._pending_leaves.clear()
+
+
+class VoiceGroup(app_commands.Group):
+    """Voice channel pool sync commands."""
+
+    def __init__(
+        self, bot: commands.Bot, initiative_manager: InitiativeManager, voice_sync: VoicePresenceSync
+    ):
+        super().__init__(name="voice", description="Keep the player pool in sync with a voice channel")
+        self.bot = bot
+        self.initiative_manager = initiative_manager
+        self.voice_sync = voice_sync
+
+    @app_commands.command(name="link", description="Keep the player pool in sync with a voice channel")
+    @app_commands.describe(channel="The voice channel whose members make up the pool")
+    @traced("voice link")
+    async def voice_link(self, interaction: discord.Interaction, channel: discord.VoiceChannel):
+        """Link the player pool to a voice channel."""
+        reply = Responder(interaction, "voice link")
+        try:
+            # Check permissions
+            if not has_manager_role(interaction.user):
+                await reply.send(
+                    "❌ You need the GM or Popcorn Manager role to manage the player pool.",
+                    ephemeral=True
+                )
+                return
+
+            added = self.voice_sync.link(interaction.guild.id, interaction.channel.id, channel)
+
+            await reply.send(
+                f"🔊 The player pool now follows {channel.mention}: {added} member(s) added. "
+                f"Players join the pool when they join the voice channel and leave it when they leave."
+            )
+        except Exception as e:
+            await reply.send(
+                f"❌ An error occurred: {str(e)}", ephemeral=True
+            )
+
+    @app_commands.command(name="unlink", description="Stop syncing the player pool with a voice channel")
+    @traced("voice unlink")
+    async def voice_unlink(self, interaction: discord.Interaction):
+        """Unlink the player pool from its voice channel."""
+        reply = Responder(interaction, "voice unlink")
+        try:
+            # Check permissions
+            if not has_manager_role(interaction.user):
+                await reply.send(
+                    "❌ You need the GM or Popcorn Manager role to manage the player pool.",
+                    ephemeral=True
+                )
+                return
+
+            if not self.voice_sync.unlink(interaction.guild.id, interaction.channel.id):
+                await reply.send(
+                    "❌ The player pool is not linked to a voice channel.",
+                    ephemeral=True
+                )
+                return
+
+            await reply.send(
+                "✅ The player pool no longer follows a voice channel. Its current players are kept."
+            )
+        except Exception as e:
+            await reply.send(
+                f"❌ An error occurred: {str(e)}", ephemeral=True
+            )
@@ -29,3 +29,55 @@ CLIENT_ID = os.getenv("DISCORD_CLIENT_ID")
 GM_ROLE_NAME = "GM"
 POPCORN_MANAGER_ROLE_NAME = "Popcorn Manager"
 
+
+# Interaction trace recording (optional, disabled unless TRACE_FILE is set)
+# Records every /popcorn interaction as compact JSON lines for offline replay
+TRACE_FILE = os.getenv("TRACE_FILE")
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_BACKUP_COUNT = int(os.getenv("TRACE_BACKUP_COUNT", "5"))
+
+# Number of turns per channel that /popcorn undo and /popcorn rewind can take back
+UNDO_DEPTH = int(os.getenv("UNDO_DEPTH", "20"))
+
+# Turn events per channel kept for /popcorn export; the oldest half is
+# dropped when the limit is reached (0 keeps every event)
+SESSION_LOG_EVENTS = int(os.getenv("SESSION_LOG_EVENTS", "10000"))
+
+# Repeated /popcorn commands from the same user with the same options and no
+# state change in between are ignored within this many seconds (0 disables)
+DEDUP_WINDOW = float(os.getenv("DEDUP_WINDOW", "2.0"))
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "10000"))
+
+# Seconds a member must stay out of a linked voice channel before they are
+# removed from its synced pools (0 removes them immediately)
+VOICE_HOLD_DOWN = float(os.getenv("VOICE_HOLD_DOWN", "30"))
+
+# Local HTTP server for operator endpoints (disabled when HTTP_PORT is 0)
+HTTP_HOST = os.getenv("HTTP_HOST", "127.0.0.1")
+HTTP_PORT = int(os.getenv("HTTP_PORT", "0"))
+
+# Bearer token the /admin HTTP endpoints require; they are not served without one
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "").strip() or None
+
+# Web page origins (e.g. "https://overlay.example.com") allowed to read the
+# /status endpoints from a browser; none by default
+STATUS_ALLOWED_ORIGINS = frozenset(
+    origin.strip().rstrip("/") for origin in os.getenv("STATUS_ALLOWED_ORIGINS", "").split(",") if origin.strip()
+)
+
+# Seconds between state version checks for channels with open status streams
+STATUS_FEED_POLL_INTERVAL = float(os.getenv("STATUS_FEED_POLL_INTERVAL", "0.25"))
+
+# Extra user IDs allowed to run /popcorn admin commands besides the bot owner
+ADMIN_USER_IDS = {
+    int(user_id) for user_id in os.getenv("ADMIN_USER_IDS", "").split(",") if user_id.strip()
+}
+
+# Event loop watchdog: sampling interval and lag (seconds) that counts as a stall
+WATCHDOG_INTERVAL = float(os.getenv("WATCHDOG_INTERVAL", "0.5"))
+WATCHDOG_LAG_THRESHOLD = float(os.getenv("WATCHDOG_LAG_THRESHOLD", "1.0"))
+
+# On-demand sampling profiler: seconds between stack samples, and the directory
+# collapsed stacks are saved to (empty keeps them in memory only)
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles") or None
@@ -1,5 +1,35 @@
 """Helpers package."""
-from .validation import validate_discord_user, has_manager_role, is_current_player_or_manager
-
-__all__ = ["validate_discord_user", "has_manager_role", "is_current_player_or_manager"]
+from .validation import (
+    validate_discord_user,
+    member_fetch_needed,
+    parse_user_id,
+    has_manager_role,
+    is_current_player_or_manager,
+    is_bot_admin,
+)
+from .responses import Responder, response_counters
+from .dedup import InteractionDeduplicator, DUPLICATE_ID, DUPLICATE_FINGERPRINT
+from .export import (
+    EXPORT_FORMATS,
+    build_session_export,
+    iter_session_rows,
+    iter_export_lines,
+)
 
+__all__ = [
+    "validate_discord_user",
+    "member_fetch_needed",
+    "parse_user_id",
+    "has_manager_role",
+    "is_current_player_or_manager",
+    "is_bot_admin",
+    "Responder",
+    "response_counters",
+    "InteractionDeduplicator",
+    "DUPLICATE_ID",
+    "DUPLICATE_FINGERPRINT",
+    "EXPORT_FORMATS",
+    "build_session_export",
+    "iter_session_rows",
+    "iter_export_lines",
+]
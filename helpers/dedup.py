@@ -0,0 +1,109 @@
+"""Suppression of retried and double-tapped slash command interactions."""
+import json
+from collections import Counter
+from typing import Optional
+
+import discord
+
+from models import InitiativeManager, TTLCache
+
+# How long handled interaction IDs are remembered; Discord interaction
+# tokens are valid for 15 minutes, so no redelivery can arrive later
+INTERACTION_ID_TTL = 15 * 60
+
+# Reasons returned by InteractionDeduplicator.check()
+DUPLICATE_ID = "interaction_id"
+DUPLICATE_FINGERPRINT = "fingerprint"
+
+# Fingerprint value while the first command is still running
+_RUNNING = object()
+
+
+class InteractionDeduplicator:
+    """
+    Detects duplicate slash command interactions before their handler runs.
+
+    An interaction is a duplicate if its ID was already handled (a client or
+    gateway redelivery), or if the same user ran the same command with the
+    same options in the same channel within ``window`` seconds (a double
+    tap) while the first is still running or the channel's state version is
+    the one it left behind. A handler changes state before its first await,
+    so the repeat can arrive either while the first is sending its reply or
+    after it finished; both are caught. A repeat after anything else changed
+    the channel is a deliberate new command and runs.
+
+    Both caches are TTLCaches bounded by ``max_entries``, so lookups are
+    O(1) and memory stays flat however busy the bot is.
+    """
+
+    def __init__(
+        self,
+        initiative_manager: InitiativeManager,
+        window: float = 2.0,
+        max_entries: int = 10000
+    ):
+        self.initiative_manager = initiative_manager
+        self.window = window
+        self._seen_ids = TTLCache(max_entries, INTERACTION_ID_TTL)
+        self._fingerprints = TTLCache(max_entries, window)
+        self.checked = 0
+        self.suppressed = Counter()
+        self.suppressed_by_command = Counter()
+
+    def _fingerprint(self, interaction: discord.Interaction) -> Optional[tuple]:
+        """Fingerprint of an interaction: channel, user, command and options."""
+        if interaction.guild is None or interaction.command is None:
+            return None
+        options = json.dumps((interaction.data or {}).get("options", []), sort_keys=True)
+        return (
+            interaction.guild.id,
+            interaction.channel_id,
+            interaction.user.id,
+            interaction.command.qualified_name,
+            options,
+        )
+
+    def _state_version(self, fingerprint: tuple) -> int:
+        return self.initiative_manager.get_state_version(fingerprint[0], fingerprint[1])
+
+    def check(self, interaction: discord.Interaction) -> Optional[str]:
+        """
+        Check an incoming command interaction and remember it.
+
+        Returns:
+            Optional[str]: DUPLICATE_ID or DUPLICATE_FINGERPRINT if the
+            interaction should be suppressed, otherwise None
+        """
+        self.checked += 1
+        reason = None
+        if interaction.id in self._seen_ids:
+            reason = DUPLICATE_ID
+        else:
+            self._seen_ids.set(interaction.id)
+            fingerprint = self._fingerprint(interaction)
+            if fingerprint is not None and self.window > 0:
+                recorded = self._fingerprints.get(fingerprint)
+                if recorded is not None and (recorded is _RUNNING or recorded == self._state_version(fingerprint)):
+                    reason = DUPLICATE_FINGERPRINT
+                else:
+                    self._fingerprints.set(fingerprint, _RUNNING)
+
+        if reason is not None:
+            self.suppressed[reason] += 1
+            if interaction.command is not None:
+                self.suppressed_by_command[interaction.command.qualified_name] += 1
+        return reason
+
+    def complete(self, interaction: discord.Interaction) -> None:
+        """Remember the state version a command left behind."""
+        fingerprint = self._fingerprint(interaction)
+        if fingerprint is not None and self.window > 0:
+            self._fingerprints.set(fingerprint, self._state_version(fingerprint))
+
+    def counters(self) -> dict:
+        """Get the number of checked and suppressed interactions."""
+        return {
+            "checked": self.checked,
+            "suppressed": dict(self.suppressed),
+            "suppressed_by_command": dict(self.suppressed_by_command),
+        }
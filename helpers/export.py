@@ -0,0 +1,116 @@
+"""Streaming export of initiative session logs."""
+import asyncio
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+from typing import Callable, Iterator, Optional
+
+from models import EVENT_TRUNCATED, SessionLog
+
+EXPORT_FORMATS = ("jsonl", "csv")
+EXPORT_COLUMNS = ("timestamp", "round", "turn", "event", "player_id", "player_name")
+
+# Rows compressed between yields to the event loop
+EXPORT_CHUNK_ROWS = 500
+
+
+class _LineBuffer:
+    """File-like object whose write() hands back the line csv.writer produced."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_session_rows(
+    session_log: SessionLog, name_lookup: Callable[[int], Optional[str]]
+) -> Iterator[tuple]:
+    """
+    Yield export rows for a session log, oldest first.
+
+    If older events were dropped by the log's size limit, the first row is
+    an EVENT_TRUNCATED marker with the round and turn of the oldest event
+    kept, so a partial log is never mistaken for a whole session.
+
+    Args:
+        session_log: The log to export
+        name_lookup: Returns a player's display name, or None if unknown
+
+    Yields:
+        tuple: One value per column in EXPORT_COLUMNS
+    """
+    truncated = session_log.dropped > 0
+    for timestamp, round_number, turn_number, event, player_id in session_log.iter_events():
+        when = datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="seconds")
+        if truncated:
+            yield (when, round_number, turn_number, EVENT_TRUNCATED, None, None)
+            truncated = False
+        yield (
+            when,
+            round_number,
+            turn_number,
+            event,
+            player_id,
+            name_lookup(player_id) if player_id is not None else None,
+        )
+
+
+def iter_export_lines(rows: Iterator[tuple], export_format: str) -> Iterator[str]:
+    """
+    Render export rows as JSON lines or CSV, one line at a time.
+
+    Raises:
+        ValueError: If the format is not one of EXPORT_FORMATS
+    """
+    if export_format == "jsonl":
+        for row in rows:
+            yield json.dumps(dict(zip(EXPORT_COLUMNS, row)), separators=(",", ":")) + "\n"
+    elif export_format == "csv":
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(EXPORT_COLUMNS)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        raise ValueError(f"Unknown export format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}.")
+
+
+async def build_session_export(
+    session_log: SessionLog,
+    export_format: str,
+    name_lookup: Callable[[int], Optional[str]],
+    chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> io.BytesIO:
+    """
+    Stream a session log into a gzip-compressed in-memory file.
+
+    Rows are generated lazily and compressed ``chunk_rows`` at a time,
+    yielding to the event loop between chunks, so only the compressed
+    output grows with the size of the log.
+
+    Args:
+        session_log: The log to export
+        export_format: "jsonl" or "csv"
+        name_lookup: Returns a player's display name, or None if unknown
+        chunk_rows: Rows compressed between yields
+
+    Returns:
+        io.BytesIO: The compressed export, positioned at the start
+
+    Raises:
+        ValueError: If the format is not one of EXPORT_FORMATS
+    """
+    lines = iter_export_lines(iter_session_rows(session_log, name_lookup), export_format)
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6) as archive:
+        pending = []
+        for line in lines:
+            pending.append(line)
+            if len(pending) >= chunk_rows:
+                archive.write("".join(pending).encode("utf-8"))
+                pending.clear()
+                await asyncio.sleep(0)
+        if pending:
+            archive.write("".join(pending).encode("utf-8"))
+    buffer.seek(0)
+    return buffer
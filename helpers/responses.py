@@ -0,0 +1,76 @@
+"""Interaction replies that stay within Discord's acknowledgment deadline."""
+from collections import Counter
+
+import discord
+
+from .validation import member_fetch_needed, validate_discord_user
+
+# Structure: {command name: handler runs}
+_runs = Counter()
+# Structure: {command name: handler runs that had to defer their reply}
+_deferred = Counter()
+
+
+def response_counters() -> dict:
+    """Get the number of handler runs and deferred replies per command."""
+    return {"runs": dict(_runs), "deferred": dict(_deferred)}
+
+
+class Responder:
+    """
+    Sends a handler's reply, deferring first when the work ahead may be slow.
+
+    Discord fails an interaction that is not acknowledged within 3 seconds.
+    Most handlers only touch in-memory state, so they answer with a single
+    immediate response. A handler about to wait on the Discord API calls
+    defer() first (resolve_member() does so when the member is not cached),
+    and every later send() goes out as a followup, error replies included.
+    """
+
+    __slots__ = ("interaction", "command_name", "_deferred_ephemeral", "_followed_up")
+
+    def __init__(self, interaction: discord.Interaction, command_name: str):
+        self.interaction = interaction
+        self.command_name = command_name
+        # None until deferred, then whether the "thinking" message is ephemeral
+        self._deferred_ephemeral = None
+        self._followed_up = False
+        _runs[command_name] += 1
+
+    @property
+    def deferred(self) -> bool:
+        """Whether the reply was deferred."""
+        return self._deferred_ephemeral is not None
+
+    async def defer(self, ephemeral: bool = False) -> None:
+        """Acknowledge the interaction now and reply through followups."""
+        if self.interaction.response.is_done():
+            return
+        await self.interaction.response.defer(ephemeral=ephemeral, thinking=True)
+        self._deferred_ephemeral = ephemeral
+        _deferred[self.command_name] += 1
+
+    async def send(self, content: str, *, ephemeral: bool = False, **kwargs) -> None:
+        """Send the reply, or a followup if the interaction was already acknowledged."""
+        interaction = self.interaction
+        if not interaction.response.is_done():
+            await interaction.response.send_message(content, ephemeral=ephemeral, **kwargs)
+            return
+        if ephemeral and self._deferred_ephemeral is False and not self._followed_up:
+            # The first followup replaces the public "thinking" message and keeps
+            # its visibility, so drop it to keep a private reply private
+            await interaction.delete_original_response()
+        await interaction.followup.send(content, ephemeral=ephemeral, **kwargs)
+        self._followed_up = True
+
+    async def resolve_member(self, user: discord.Member | str) -> discord.Member:
+        """
+        Validate a user option, deferring first if the member has to be fetched.
+
+        Raises:
+            ValueError: If the user is invalid or not in the guild
+        """
+        guild = self.interaction.guild
+        if member_fetch_needed(user, guild):
+            await self.defer()
+        return await validate_discord_user(user, guild)
@@ -1,15 +1,37 @@
 """Validation and permission checking helpers."""
 import discord
-from discord import Member, User, Guild
-from config import GM_ROLE_NAME, POPCORN_MANAGER_ROLE_NAME
+from discord import Member, Guild
+from config import GM_ROLE_NAME, POPCORN_MANAGER_ROLE_NAME, ADMIN_USER_IDS
 
 
-async def validate_discord_user(user: User | Member, guild: Guild) -> Member:
+def parse_user_id(value: str) -> int:
+    """
+    Parse a user ID from an autocomplete value or a typed mention.
+    
+    Args:
+        value: A raw user ID (``"1234"``) or mention (``"<@1234>"``, ``"<@!1234>"``)
+        
+    Returns:
+        int: The parsed user ID
+        
+    Raises:
+        ValueError: If the value is not a user ID or mention
+    """
+    text = value.strip()
+    if text.startswith("<@") and text.endswith(">"):
+        text = text[2:-1].lstrip("!")
+    if not text.isdigit():
+        raise ValueError(f"'{value}' is not a valid user. Pick a player from the suggestions.")
+    return int(text)
+
+
+async def validate_discord_user(user: Member | str, guild: Guild) -> Member:
     """
     Validate that a user is a valid Discord user in the guild.
     
     Args:
-        user: The user to validate
+        user: A member resolved by a ``discord.Member`` option, or a user
+            ID/mention string from an autocompleted option
         guild: The guild to check membership in
         
     Returns:
@@ -21,28 +43,47 @@ async def validate_discord_user(user: User | Member, guild: Guild) -> Member:
     if not user:
         raise ValueError("User parameter is required.")
     
-    # Try to get the member from the guild
+    # Member options arrive resolved; autocomplete values are a user ID
     if isinstance(user, Member):
         member = user
     else:
-        member = guild.get_member(user.id)
+        user_id = parse_user_id(user)
+        member = guild.get_member(user_id)
         if not member:
-            # Try to fetch if not cached
             try:
-                member = await guild.fetch_member(user.id)
+                member = await guild.fetch_member(user_id)
             except discord.NotFound:
-                raise ValueError(f"User {user.mention} is not a member of this server.")
-    
-    if not member:
-        raise ValueError(f"User {user.mention} is not a member of this server.")
+                raise ValueError(f"User <@{user_id}> is not a member of this server.")
     
     # Check if user is a bot (optional - you may want to allow bots)
     # if member.bot:
-    #     raise ValueError(f"User {user.mention} is a bot and cannot participate.")
+    #     raise ValueError(f"User {member.mention} is a bot and cannot participate.")
     
     return member
 
 
+def member_fetch_needed(user: Member | str, guild: Guild) -> bool:
+    """
+    Check whether validate_discord_user would have to fetch the member from
+    the Discord API rather than the guild's member cache.
+
+    Args:
+        user: The user as passed to validate_discord_user
+        guild: The guild to check membership in
+
+    Returns:
+        bool: True if the member is not cached; False if validation
+        succeeds or fails without an API call
+    """
+    if not user or isinstance(user, Member):
+        return False
+    try:
+        user_id = parse_user_id(user)
+    except ValueError:
+        return False
+    return guild.get_member(user_id) is None
+
+
 def has_manager_role(member: Member) -> bool:
     """
     Check if a member has GM or Popcorn Manager role.
@@ -84,3 +125,18 @@ async def is_current_player_or_manager(
     
     return initiative.get_current_player() == member.id
 
+
+
+async def is_bot_admin(interaction: discord.Interaction) -> bool:
+    """
+    Check if the invoking user may run bot-wide admin commands.
+    
+    Args:
+        interaction: The interaction to check
+        
+    Returns:
+        bool: True if the user owns the bot application or is in ADMIN_USER_IDS
+    """
+    if interaction.user.id in ADMIN_USER_IDS:
+        return True
+    return await interaction.client.is_owner(interaction.user)
@@ -1,5 +1,41 @@
 """Models package."""
-from .initiative import Initiative, InitiativeManager
-
-__all__ = ["Initiative", "InitiativeManager"]
+from .initiative import (
+    Initiative,
+    InitiativeManager,
+    seed_random,
+    reset_random,
+    next_version,
+    TURN_POLICY_ANY,
+    TURN_POLICY_ALTERNATE,
+    TURN_POLICIES,
+)
+from .name_index import NameIndex
+from .alias import AliasTable
+from .indexed_set import IndexedSet
+from .channel_state import ChannelState, pack_key, unpack_key, is_shared_empty
+from .session_log import EVENT_TRUNCATED, SessionLog
+from .state_stats import SizeHistogram, StateStats
+from .ttl_cache import TTLCache
 
+__all__ = [
+    "Initiative",
+    "InitiativeManager",
+    "NameIndex",
+    "AliasTable",
+    "IndexedSet",
+    "ChannelState",
+    "pack_key",
+    "unpack_key",
+    "is_shared_empty",
+    "SessionLog",
+    "EVENT_TRUNCATED",
+    "SizeHistogram",
+    "StateStats",
+    "TTLCache",
+    "seed_random",
+    "reset_random",
+    "next_version",
+    "TURN_POLICY_ANY",
+    "TURN_POLICY_ALTERNATE",
+    "TURN_POLICIES",
+]
@@ -0,0 +1,57 @@
+"""Alias-method sampler for O(1) weighted random draws."""
+import random
+from typing import Generic, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class AliasTable(Generic[T]):
+    """
+    Walker/Vose alias table over a fixed set of weighted items.
+
+    Building the table is O(n); each draw afterwards is O(1): pick a column
+    uniformly, then keep it or take its alias with one biased coin flip.
+    """
+
+    __slots__ = ("items", "total_weight", "_prob", "_alias")
+
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        n = len(items)
+        if n == 0:
+            raise ValueError("AliasTable needs at least one item")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("AliasTable weights must sum to a positive value")
+
+        self.items: List[T] = list(items)
+        self.total_weight = total
+        prob = [w * n / total for w in weights]
+        alias = [0] * n
+
+        small = [i for i, p in enumerate(prob) if p < 1.0]
+        large = [i for i, p in enumerate(prob) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            alias[s] = l
+            prob[l] = prob[l] + prob[s] - 1.0
+            if prob[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        # Leftovers are 1.0 up to floating point error
+        for i in small + large:
+            prob[i] = 1.0
+
+        self._prob = prob
+        self._alias = alias
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample(self, rng: random.Random) -> T:
+        """Draw one item with probability proportional to its weight."""
+        i = int(rng.random() * len(self._prob))
+        if rng.random() < self._prob[i]:
+            return self.items[i]
+        return self.items[self._alias[i]]
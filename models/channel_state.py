@@ -0,0 +1,85 @@
+"""Per-channel state record and the packed keys it is stored under."""
+from typing import TYPE_CHECKING, AbstractSet, Mapping, Optional, Set, Tuple, Union
+
+from .indexed_set import IndexedSet
+from .name_index import NameIndex
+
+if TYPE_CHECKING:
+    from .initiative import Initiative
+
+# Discord snowflakes fit in 64 bits, so a guild/channel pair packs into one int
+_CHANNEL_BITS = 64
+_CHANNEL_MASK = (1 << _CHANNEL_BITS) - 1
+
+
+def _read_only(self, *args, **kwargs):
+    """
+    Refuse an insert into a shared empty container. Removals are left
+    alone, since on an empty container they cannot change anything.
+    """
+    raise TypeError("shared empty container is read-only")
+
+
+class _EmptyMapping(dict):
+    """Empty dict that refuses inserts; reads stay as fast as a plain dict's."""
+
+    __slots__ = ()
+
+    __setitem__ = __ior__ = setdefault = update = _read_only
+
+
+class _EmptyIndexedSet(IndexedSet):
+    """Empty IndexedSet that refuses inserts."""
+
+    __slots__ = ()
+
+    add = _read_only
+
+
+# Shared empty containers for state a channel has not used yet. They refuse
+# inserts: writers swap in a container of their own first, so a channel that
+# only ever reads pays for none of them.
+EMPTY_MAPPING: Mapping = _EmptyMapping()
+EMPTY_SEQUENCE: tuple = ()
+EMPTY_PARTICIPANTS: IndexedSet = _EmptyIndexedSet()
+EMPTY_POOL: AbstractSet[int] = frozenset()
+
+# Identities of the sentinels; they live as long as the module
+_SHARED_EMPTY_IDS = frozenset(map(id, (EMPTY_MAPPING, EMPTY_SEQUENCE, EMPTY_PARTICIPANTS, EMPTY_POOL)))
+
+
+def pack_key(guild_id: int, channel_id: int) -> int:
+    """Pack a guild/channel pair into a single integer key."""
+    return (guild_id << _CHANNEL_BITS) | channel_id
+
+
+def unpack_key(key: int) -> Tuple[int, int]:
+    """Split a packed key back into (guild_id, channel_id)."""
+    return key >> _CHANNEL_BITS, key & _CHANNEL_MASK
+
+
+def is_shared_empty(container: object) -> bool:
+    """Check whether a container is one of the shared empty sentinels."""
+    return id(container) in _SHARED_EMPTY_IDS
+
+
+class ChannelState:
+    """
+    Everything held for one guild/channel (or shared roster) in one record.
+
+    Parts a channel has not used stay None: a channel with only a pool has
+    no Initiative, and an inheriting thread or a roster-bound channel has no
+    pool of its own.
+    """
+
+    __slots__ = ("key", "initiative", "pool", "names", "pool_version")
+
+    def __init__(self, key: Union[int, Tuple[int, str]]):
+        # The packed key (or roster key) the record is stored under
+        self.key = key
+        self.initiative: Optional["Initiative"] = None
+        self.pool: Optional[Set[int]] = None
+        # Display names of the pool members, for autocomplete
+        self.names: Optional[NameIndex] = None
+        # Version of the last pool change or change to where the pool comes from
+        self.pool_version = 0
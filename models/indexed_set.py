@@ -0,0 +1,67 @@
+"""Set with O(1) add, remove, membership and random access."""
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class IndexedSet:
+    """
+    Unordered set of player IDs backed by a list plus a position map.
+
+    Removal swaps the last element into the removed slot, so every operation
+    is O(1) and the members can be indexed for uniform random picks.
+    """
+
+    __slots__ = ("_items", "_positions")
+
+    def __init__(self, items: Optional[Iterable[int]] = None):
+        self._items: List[int] = []
+        self._positions: Dict[int, int] = {}
+        if items is not None:
+            for item in items:
+                self.add(item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __contains__(self, item: int) -> bool:
+        return item in self._positions
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __repr__(self) -> str:
+        return f"IndexedSet({self._items!r})"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, IndexedSet):
+            return self._positions.keys() == other._positions.keys()
+        return NotImplemented
+
+    def add(self, item: int) -> bool:
+        """Add an item. Returns True if it was not already present."""
+        if item in self._positions:
+            return False
+        self._positions[item] = len(self._items)
+        self._items.append(item)
+        return True
+
+    def discard(self, item: int) -> bool:
+        """Remove an item if present. Returns True if it was removed."""
+        position = self._positions.pop(item, None)
+        if position is None:
+            return False
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._positions[last] = position
+        return True
+
+    def clear(self) -> None:
+        """Remove every item."""
+        self._items.clear()
+        self._positions.clear()
@@ -1,15 +1,183 @@
 """Data models for Popcorn Initiative tracking."""
-from typing import Optional, Set, List
+from typing import AbstractSet, Optional, Set, List, Iterable, Tuple, Dict, Mapping, Sequence
+from array import array
+from contextvars import ContextVar, Token
 from dataclasses import dataclass, field
+import hashlib
+import itertools
 import random
 
+from .alias import AliasTable
+from .channel_state import (
+    EMPTY_MAPPING,
+    EMPTY_PARTICIPANTS,
+    EMPTY_POOL,
+    EMPTY_SEQUENCE,
+    ChannelState,
+    pack_key,
+)
+from .indexed_set import IndexedSet
+from .name_index import NameIndex
+from .session_log import DEFAULT_SESSION_LOG_EVENTS, SessionLog
+from .state_stats import StateStats
 
-@dataclass
+# Typecode of a signed 64-bit integer for packed ID arrays; Discord
+# snowflakes are below 2**63
+ID_TYPECODE = "q"
+
+# Random source for turn selection. A traced command gets a seeded source of
+# its own for its context (see seed_random), so commands that interleave at
+# their awaits never draw from each other's stream and a recorded session
+# replays deterministically.
+_rng = random.Random()
+_command_rng: ContextVar[Optional[random.Random]] = ContextVar("command_rng", default=None)
+
+# Weight of a participant with no explicit weight
+DEFAULT_WEIGHT = 1.0
+
+# Turn policies for channels with sides: any side may go next, or the next
+# player must come from a different side than the current one while possible
+TURN_POLICY_ANY = "any"
+TURN_POLICY_ALTERNATE = "alternate"
+TURN_POLICIES = (TURN_POLICY_ANY, TURN_POLICY_ALTERNATE)
+
+# Number of turns per channel that can be undone
+DEFAULT_UNDO_DEPTH = 20
+
+# Undo log operations. Each turn is recorded as a list of these reversible
+# deltas rather than a copy of the state. A round boundary keeps the previous
+# participant set, history and name index by reference. A new round starts
+# with a fresh participant set and name index, so the kept ones are not
+# written again until undo restores them. History spans rounds and stays the
+# same array (only reset() replaces it): later turns append to the array the
+# round step holds. That is safe because every append is logged as an
+# _OP_HISTORY in a later step, and undo pops steps last-in first-out, so those
+# appends are popped before the round step puts the array back in place.
+_OP_ADD = "add"          # (op, player_id) joined participants
+_OP_REMOVE = "remove"    # (op, player_id, display_name) left participants
+_OP_HISTORY = "history"  # (op, player_id) appended to history
+_OP_CURRENT = "current"  # (op, previous_player_id)
+_OP_ROUND = "round"      # (op, previous_participants, previous_history, previous_player_id, previous_names)
+_OP_COUNTERS = "counters"  # (op, previous_round_number, previous_turn_number) of the session log
+
+# Prefix of the pool keys that hold guild-level shared rosters
+ROSTER_KEY_PREFIX = "roster:"
+
+# Global monotonic clock for state versions, so a version never repeats even
+# after a channel's state is purged and recreated
+_version_clock = itertools.count(1)
+
+
+def seed_random(seed: int) -> Token:
+    """
+    Give the current context, such as a command's task, its own random
+    source for turn selection, seeded with ``seed``.
+
+    Returns:
+        Token: Pass to reset_random() to drop the source again
+    """
+    return _command_rng.set(random.Random(seed))
+
+
+def reset_random(token: Token) -> None:
+    """Drop a random source installed by seed_random()."""
+    _command_rng.reset(token)
+
+
+def _random() -> random.Random:
+    """Get the random source of the current context."""
+    rng = _command_rng.get()
+    return _rng if rng is None else rng
+
+
+def next_version() -> int:
+    """Get the next state version from the global clock."""
+    return next(_version_clock)
+
+
+def _display_name(names: Optional[NameIndex], player_id: int) -> str:
+    """Look a player's display name up in a name index, falling back to their ID."""
+    name = names.get_name(player_id) if names is not None else None
+    return name if name is not None else str(player_id)
+
+
+def _renames(names: Optional[NameIndex], player_id: int, display_name: str) -> bool:
+    """Check whether a name index holds a player under a different name."""
+    if names is None:
+        return False
+    current = names.get_name(player_id)
+    return current is not None and current != display_name
+
+
+@dataclass(slots=True)
 class Initiative:
-    """Represents an active Popcorn Initiative instance."""
+    """
+    Represents an active Popcorn Initiative instance.
+
+    Containers start out as the shared empty sentinels from channel_state
+    and are only allocated once written, so an idle or ended initiative
+    holds little more than its slots.
+    """
     current_player_id: Optional[int] = None
-    participants: List[int] = field(default_factory=list)
-    history: List[int] = field(default_factory=list)
+    participants: IndexedSet = field(default_factory=lambda: EMPTY_PARTICIPANTS)
+    # Display names of the remaining participants, for autocomplete; kept in
+    # step with participants so a late-round lookup only sees who is left
+    participant_names: Optional[NameIndex] = field(default=None, repr=False, compare=False)
+    # Players who acted, in order, as a packed array('q') once anyone has
+    history: Sequence[int] = field(default_factory=lambda: EMPTY_SEQUENCE)
+    # State version, bumped from the global clock on every mutation
+    version: int = field(default=0, compare=False)
+    # Selection weights by player ID; players not listed weigh DEFAULT_WEIGHT.
+    # Weights, sides and the turn policy outlive resets so they carry over
+    # between rounds.
+    weights: Mapping[int, float] = field(default_factory=lambda: EMPTY_MAPPING)
+    # Side name by player ID; players not listed are unassigned (side None)
+    sides: Mapping[int, str] = field(default_factory=lambda: EMPTY_MAPPING)
+    turn_policy: str = TURN_POLICY_ANY
+    # Remaining participants indexed by side, and the total weight of each
+    # side's remaining participants. Only non-empty sides have entries.
+    _side_members: Mapping[Optional[str], IndexedSet] = field(
+        default_factory=lambda: EMPTY_MAPPING, repr=False, compare=False
+    )
+    _side_weights: Mapping[Optional[str], float] = field(
+        default_factory=lambda: EMPTY_MAPPING, repr=False, compare=False
+    )
+    # Per-side alias tables over the side's members at build time. Players
+    # removed since are rejected on draw; a table is rebuilt lazily when
+    # weights change, players join the side, or less than half of its weight
+    # is still live.
+    _samplers: Mapping[Optional[str], AliasTable] = field(
+        default_factory=lambda: EMPTY_MAPPING, repr=False, compare=False
+    )
+    # Number of turns kept for undo, and the undo log itself: one list of
+    # reversible deltas per turn, newest last. It is a list created on the
+    # first turn and trimmed from the front; a deque would allocate a
+    # 64-slot block per channel up front.
+    undo_depth: int = field(default=DEFAULT_UNDO_DEPTH, repr=False, compare=False)
+    _undo_log: Sequence[list] = field(
+        default_factory=lambda: EMPTY_SEQUENCE, init=False, repr=False, compare=False
+    )
+    # Set between a round start and its first pick, which share one undo step
+    _round_pending: bool = field(default=False, init=False, repr=False, compare=False)
+    # Players withdrawn outside the undo log (they left a linked voice
+    # channel); undo does not bring them back until they are readmitted
+    _withdrawn: Optional[Set[int]] = field(default=None, init=False, repr=False, compare=False)
+    # Turn events for export; like weights, the log outlives resets
+    session_log: SessionLog = field(default_factory=SessionLog, repr=False, compare=False)
+    # Running stats of the manager holding this initiative, told before each change
+    _stats: Optional[StateStats] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not isinstance(self.participants, IndexedSet):
+            self.participants = IndexedSet(self.participants)
+        if self.participants and self.participant_names is None:
+            self.participant_names = NameIndex.from_names(
+                (player_id, str(player_id)) for player_id in self.participants
+            )
+        if self.history and not isinstance(self.history, array):
+            self.history = array(ID_TYPECODE, self.history)
+        for player_id in self.participants:
+            self._index_participant(player_id)
 
     def get_current_player(self) -> Optional[int]:
         """Get the current player ID."""
@@ -23,115 +191,970 @@ class Initiative:
         """Check if there are remaining participants."""
         return len(self.participants) > 0
 
-    def add_to_participants(self, player_id: int) -> None:
+    def is_participant(self, player_id: int) -> bool:
+        """Check if a player is a remaining participant."""
+        return player_id in self.participants
+
+    def _writable_participants(self) -> IndexedSet:
+        """Get the participant set, replacing the shared empty one first."""
+        if self.participants is EMPTY_PARTICIPANTS:
+            self.participants = IndexedSet()
+        return self.participants
+
+    def _append_history(self, player_id: int) -> bool:
+        """Append a player to history unless present. Returns True if appended."""
+        if player_id in self.history:
+            return False
+        if self.history is EMPTY_SEQUENCE:
+            self.history = array(ID_TYPECODE)
+        self.history.append(player_id)
+        return True
+
+    def _clear_side_index(self, release: bool = False) -> None:
+        """
+        Empty the side indexes, in place to be refilled by the next round,
+        or with ``release`` back to the shared empty mappings.
+        """
+        if release or self._side_members is EMPTY_MAPPING:
+            self._side_members = EMPTY_MAPPING
+            self._side_weights = EMPTY_MAPPING
+            self._samplers = EMPTY_MAPPING
+        else:
+            self._side_members.clear()
+            self._side_weights.clear()
+            self._samplers.clear()
+
+    def _index_participant(self, player_id: int) -> None:
+        """Add a participant to its side's index."""
+        if self._side_members is EMPTY_MAPPING:
+            self._side_members = {}
+            self._side_weights = {}
+            self._samplers = {}
+        side = self.sides.get(player_id)
+        members = self._side_members.get(side)
+        if members is None:
+            members = self._side_members[side] = IndexedSet()
+            self._side_weights[side] = 0.0
+        members.add(player_id)
+        self._side_weights[side] += self.get_weight(player_id)
+        self._samplers.pop(side, None)
+
+    def _unindex_participant(self, player_id: int) -> None:
+        """Remove a participant from its side's index."""
+        side = self.sides.get(player_id)
+        members = self._side_members[side]
+        members.discard(player_id)
+        if members:
+            self._side_weights[side] -= self.get_weight(player_id)
+        else:
+            del self._side_members[side]
+            del self._side_weights[side]
+            self._samplers.pop(side, None)
+
+    def _reindex_participants(self) -> None:
+        """Rebuild the side indexes from the participant set."""
+        self._clear_side_index()
+        for player_id in self.participants:
+            self._index_participant(player_id)
+
+    def _changing(self) -> None:
+        """Tell the manager's running stats that this initiative is about to change."""
+        if self._stats is not None:
+            self._stats.initiative_changing(self)
+
+    def _record(self, op: tuple) -> None:
+        """Add a delta to the newest turn in the undo log."""
+        if self._undo_log:
+            self._undo_log[-1].append(op)
+
+    def _push_undo_step(self, step: list) -> None:
+        """Start a new turn in the undo log."""
+        if self.undo_depth <= 0:
+            return
+        if self._undo_log is EMPTY_SEQUENCE:
+            self._undo_log = []
+        self._undo_log.append(step)
+        if len(self._undo_log) > self.undo_depth:
+            del self._undo_log[0]
+
+    def set_participants(self, player_ids: Iterable[int], display_names: Optional[NameIndex] = None) -> None:
+        """
+        Replace the remaining participants, starting a new round.
+
+        Participant names are taken from ``display_names`` (usually the
+        pool's name index); players it does not know are named by their ID.
+        """
+        self._changing()
+        self._push_undo_step([
+            (_OP_ROUND, self.participants, self.history, self.current_player_id, self.participant_names),
+            (_OP_COUNTERS, self.session_log.round_number, self.session_log.turn_number),
+        ])
+        self._round_pending = True
+        self.session_log.round_started()
+        self.participants = IndexedSet()
+        self._clear_side_index()
+        for player_id in player_ids:
+            if self.participants.add(player_id):
+                self._index_participant(player_id)
+        self.participant_names = NameIndex.from_names(
+            (player_id, _display_name(display_names, player_id)) for player_id in self.participants
+        )
+        self.version = next_version()
+
+    def _name_participant(self, player_id: int, display_name: str) -> None:
+        """Add a participant to the participant name index."""
+        if self.participant_names is None:
+            self.participant_names = NameIndex()
+        self.participant_names.add(player_id, display_name)
+
+    def add_to_participants(self, player_id: int, display_name: Optional[str] = None) -> None:
         """Add a player to participants if not already present."""
-        if player_id not in self.participants:
-            self.participants.append(player_id)
+        self._changing()
+        if self._writable_participants().add(player_id):
+            self._index_participant(player_id)
+            self._name_participant(player_id, display_name or str(player_id))
+            self._record((_OP_ADD, player_id))
+            self.version = next_version()
 
     def remove_from_participants(self, player_id: int) -> None:
         """Remove a player from participants."""
-        if player_id in self.participants:
-            self.participants.remove(player_id)
+        self._changing()
+        display_name = None
+        if self.participant_names is not None:
+            display_name = self.participant_names.get_name(player_id)
+        if self._drop_participant(player_id):
+            self._record((_OP_REMOVE, player_id, display_name))
+            self.version = next_version()
+
+    def _drop_participant(self, player_id: int) -> bool:
+        """Remove a participant and their name. Returns True if they were one."""
+        if not self.participants.discard(player_id):
+            return False
+        self._unindex_participant(player_id)
+        if self.participant_names is not None:
+            self.participant_names.remove(player_id)
+        return True
+
+    def withdraw_participant(self, player_id: int) -> None:
+        """
+        Remove a player who can no longer take part, such as one who left a
+        linked voice channel.
+
+        Unlike remove_from_participants this is not part of any turn, so
+        undo neither puts the player back nor loses the removal; undoing
+        turns or rounds from before it keeps them out until
+        readmit_participant().
+        """
+        self._changing()
+        if self._withdrawn is None:
+            self._withdrawn = set()
+        self._withdrawn.add(player_id)
+        if self._drop_participant(player_id):
+            self.version = next_version()
+
+    def readmit_participant(self, player_id: int) -> None:
+        """Let undo restore a withdrawn player again, e.g. after they rejoin voice."""
+        if self._withdrawn is not None:
+            self._changing()
+            self._withdrawn.discard(player_id)
+            if not self._withdrawn:
+                self._withdrawn = None
 
     def move_to_history(self, player_id: int) -> None:
         """Move a player from participants to history."""
+        self._changing()
         self.remove_from_participants(player_id)
-        if player_id not in self.history:
-            self.history.append(player_id)
+        if self._append_history(player_id):
+            self._record((_OP_HISTORY, player_id))
+            self.version = next_version()
 
     def set_current_player(self, player_id: int) -> None:
         """Set the current player and move them from participants if needed."""
+        self._changing()
+        if self._round_pending and self._undo_log:
+            self._record((_OP_CURRENT, self.current_player_id))
+        else:
+            self._push_undo_step([
+                (_OP_CURRENT, self.current_player_id),
+                (_OP_COUNTERS, self.session_log.round_number, self.session_log.turn_number),
+            ])
+        self._round_pending = False
         self.current_player_id = player_id
+        self.session_log.turn_taken(player_id)
         self.remove_from_participants(player_id)
-        if player_id not in self.history:
-            self.history.append(player_id)
+        if self._append_history(player_id):
+            self._record((_OP_HISTORY, player_id))
+        self.version = next_version()
+
+    def undo_available(self) -> int:
+        """Get the number of turns that can currently be undone."""
+        return len(self._undo_log)
+
+    def undo(self) -> bool:
+        """
+        Undo the most recent turn, including any participant changes since.
+
+        Turns are turn passes (together with the round start they open, if
+        any) and resets. Weights, sides and
+        the turn policy are settings rather than turn state and are kept.
+
+        Returns:
+            bool: True if a turn was undone
+        """
+        self._changing()
+        self._round_pending = False
+        if not self._undo_log:
+            return False
+        self.session_log.turn_undone(self.current_player_id)
+        withdrawn = self._withdrawn or ()
+        for op in reversed(self._undo_log.pop()):
+            kind = op[0]
+            if kind == _OP_ADD:
+                self._drop_participant(op[1])
+            elif kind == _OP_REMOVE:
+                if op[1] not in withdrawn and self._writable_participants().add(op[1]):
+                    self._index_participant(op[1])
+                    self._name_participant(op[1], op[2] or str(op[1]))
+            elif kind == _OP_HISTORY:
+                if self.history and self.history[-1] == op[1]:
+                    self.history.pop()
+            elif kind == _OP_CURRENT:
+                self.current_player_id = op[1]
+            elif kind == _OP_ROUND:
+                _, self.participants, self.history, self.current_player_id, self.participant_names = op
+                # The restored set is no longer referenced by the log, so
+                # withdrawn players can be dropped from it in place
+                for player_id in withdrawn:
+                    if self.participants.discard(player_id) and self.participant_names is not None:
+                        self.participant_names.remove(player_id)
+                self._reindex_participants()
+            elif kind == _OP_COUNTERS:
+                _, self.session_log.round_number, self.session_log.turn_number = op
+        self.version = next_version()
+        return True
+
+    def rewind(self, turns: int) -> int:
+        """
+        Undo up to the given number of turns.
+
+        Returns:
+            int: Number of turns undone
+        """
+        undone = 0
+        while undone < turns and self.undo():
+            undone += 1
+        return undone
+
+    def get_weight(self, player_id: int) -> float:
+        """Get a player's selection weight."""
+        return self.weights.get(player_id, DEFAULT_WEIGHT)
+
+    def set_weight(self, player_id: int, weight: float) -> None:
+        """Set a player's selection weight; DEFAULT_WEIGHT clears it."""
+        self._changing()
+        if weight <= 0:
+            raise ValueError("Weight must be greater than zero.")
+        participating = player_id in self.participants
+        if participating:
+            self._unindex_participant(player_id)
+        if weight == DEFAULT_WEIGHT:
+            if player_id in self.weights:
+                del self.weights[player_id]
+        else:
+            if self.weights is EMPTY_MAPPING:
+                self.weights = {}
+            self.weights[player_id] = weight
+        if participating:
+            self._index_participant(player_id)
+        self.version = next_version()
+
+    def get_side(self, player_id: int) -> Optional[str]:
+        """Get a player's side, or None if unassigned."""
+        return self.sides.get(player_id)
+
+    def set_side(self, player_id: int, side: Optional[str]) -> None:
+        """Assign a player to a side; None unassigns them."""
+        self._changing()
+        participating = player_id in self.participants
+        if participating:
+            self._unindex_participant(player_id)
+        if side is None:
+            if player_id in self.sides:
+                del self.sides[player_id]
+        else:
+            if self.sides is EMPTY_MAPPING:
+                self.sides = {}
+            self.sides[player_id] = side
+        if participating:
+            self._index_participant(player_id)
+        self.version = next_version()
+
+    def set_turn_policy(self, policy: str) -> None:
+        """Set the turn policy (TURN_POLICY_ANY or TURN_POLICY_ALTERNATE)."""
+        if policy not in TURN_POLICIES:
+            raise ValueError(f"Unknown turn policy '{policy}'. Use one of: {', '.join(TURN_POLICIES)}.")
+        self._changing()
+        self.turn_policy = policy
+        self.version = next_version()
+
+    def remaining_by_side(self) -> Dict[Optional[str], int]:
+        """Count remaining participants per side."""
+        return {side: len(members) for side, members in self._side_members.items()}
+
+    def _eligible_sides(self) -> List[Optional[str]]:
+        """Sides the next player may come from under the turn policy."""
+        sides = list(self._side_members)
+        if self.turn_policy == TURN_POLICY_ALTERNATE and self.current_player_id is not None:
+            current_side = self.sides.get(self.current_player_id)
+            other_sides = [side for side in sides if side != current_side]
+            # Once the other sides are exhausted the current side may continue
+            if other_sides:
+                return other_sides
+        return sides
+
+    def _select_from_side(self, side: Optional[str], rng: random.Random) -> int:
+        """Pick a remaining participant of a side, weighted if weights are set."""
+        members = self._side_members[side]
+        if not self.weights:
+            return members[int(rng.random() * len(members))]
+
+        sampler = self._samplers.get(side)
+        if sampler is None or self._side_weights[side] * 2 < sampler.total_weight:
+            sampler = self._samplers[side] = AliasTable(
+                list(members), [self.get_weight(player_id) for player_id in members]
+            )
+        while True:
+            player_id = sampler.sample(rng)
+            if player_id in members:
+                return player_id
 
     def select_random_participant(self) -> Optional[int]:
-        """Randomly select a participant."""
+        """
+        Randomly select an eligible participant, weighted by selection weight.
+
+        A side is picked in proportion to the remaining weight of each side
+        the turn policy allows, then a player within it: uniformly from the
+        side's index when no weights are set, otherwise from a lazily built
+        alias table that rejects players who left since it was built. Cost
+        depends on the number of sides, not on the roster size.
+        """
         if not self.participants:
             return None
-        return random.choice(self.participants)
+
+        rng = _random()
+        sides = self._eligible_sides()
+        side = sides[0]
+        if len(sides) > 1:
+            target = rng.random() * sum(self._side_weights[s] for s in sides)
+            for side in sides:
+                target -= self._side_weights[side]
+                if target < 0:
+                    break
+        return self._select_from_side(side, rng)
 
     def reset(self) -> None:
-        """Reset the initiative to empty state."""
+        """Reset the initiative to empty state; undo restores it."""
+        self._changing()
+        if self.current_player_id is not None or self.participants or self.history:
+            self._push_undo_step([
+                (_OP_ROUND, self.participants, self.history, self.current_player_id, self.participant_names)
+            ])
+            self.session_log.ended()
+        self._round_pending = False
         self.current_player_id = None
-        self.participants.clear()
-        self.history.clear()
+        self.participants = EMPTY_PARTICIPANTS
+        self.participant_names = None
+        self._clear_side_index(release=True)
+        self.history = EMPTY_SEQUENCE
+        self.version = next_version()
 
 
 class InitiativeManager:
     """Manages initiative instances by guild and channel."""
     
-    def __init__(self):
-        # Structure: {(guild_id, channel_id): Initiative}
-        self._initiatives: dict[tuple[int, int], Initiative] = {}
-        # Structure: {(guild_id, channel_id): Set[player_id]}
-        self._player_pools: dict[tuple[int, int], Set[int]] = {}
+    def __init__(
+        self,
+        undo_depth: int = DEFAULT_UNDO_DEPTH,
+        session_log_events: int = DEFAULT_SESSION_LOG_EVENTS
+    ):
+        # Turns each channel's initiative keeps for undo, and turn events it
+        # keeps for export
+        self.undo_depth = undo_depth
+        self.session_log_events = session_log_events
+        # Structure: {pack_key(guild_id, channel_id): ChannelState} holding
+        # each channel's initiative, pool, pool name index and pool version
+        self._channels: dict[int, ChannelState] = {}
+        # Secondary index: {guild_id: Set[channel_id]} of every channel with state
+        self._guild_channels: dict[int, Set[int]] = {}
+        # Structure: {packed key of a thread: parent_channel_id}; a thread reads
+        # its parent's pool until its own pool is first modified (copy-on-write)
+        self._thread_parents: dict[int, int] = {}
+        # Guild-level shared rosters, each a ChannelState without an initiative,
+        # under roster keys (guild_id, "roster:<name>"). Channels bound to a
+        # roster read and write it by reference instead of holding their own pool.
+        self._rosters: dict[tuple[int, str], ChannelState] = {}
+        # Secondary index: {guild_id: Set["roster:<name>"]} of every roster
+        self._guild_rosters: dict[int, Set[str]] = {}
+        # Structure: {packed channel key: roster_name}
+        self._roster_bindings: dict[int, str] = {}
+        # Structure: {roster_key: number of channels bound to it}
+        self._roster_refcounts: dict[tuple[int, str], int] = {}
+        # Pools kept in sync with a voice channel's members.
+        # Structure: {packed channel key: voice_channel_id}
+        self._voice_links: dict[int, int] = {}
+        # Reverse index: {packed voice channel key: Set[channel_id]}
+        self._voice_followers: dict[int, Set[int]] = {}
+        # Running counts and sizes of the records above for the admin stats;
+        # every change to a record's pool, name index or initiative goes
+        # through it
+        self.stats = StateStats()
+
+    def get_key(self, guild_id: int, channel_id: int) -> int:
+        """Get the packed key for guild/channel combination."""
+        return pack_key(guild_id, channel_id)
 
-    def get_key(self, guild_id: int, channel_id: int) -> tuple[int, int]:
-        """Get the key for guild/channel combination."""
-        return (guild_id, channel_id)
+    def _track_channel(self, guild_id: int, channel_id: int) -> None:
+        """Record that a guild/channel holds state in the guild index."""
+        channels = self._guild_channels.get(guild_id)
+        if channels is None:
+            channels = self._guild_channels[guild_id] = set()
+        channels.add(channel_id)
+
+    def _channel_state(self, guild_id: int, channel_id: int) -> ChannelState:
+        """Get or create the state record of a guild/channel."""
+        key = pack_key(guild_id, channel_id)
+        state = self._channels.get(key)
+        if state is None:
+            state = self._channels[key] = ChannelState(key)
+            self.stats.record_added(state)
+            self._track_channel(guild_id, channel_id)
+        return state
 
     def get_initiative(self, guild_id: int, channel_id: int) -> Initiative:
         """Get or create initiative for a guild/channel."""
-        key = self.get_key(guild_id, channel_id)
-        if key not in self._initiatives:
-            self._initiatives[key] = Initiative()
-        return self._initiatives[key]
+        state = self._channel_state(guild_id, channel_id)
+        if state.initiative is None:
+            state.initiative = Initiative(
+                undo_depth=self.undo_depth,
+                session_log=SessionLog(self.session_log_events)
+            )
+            self.stats.initiative_added(state.initiative)
+        return state.initiative
+
+    def find_initiative(self, guild_id: int, channel_id: int) -> Optional[Initiative]:
+        """Get the initiative for a guild/channel without creating one."""
+        state = self._channels.get(pack_key(guild_id, channel_id))
+        return state.initiative if state is not None else None
 
     def clear_initiative(self, guild_id: int, channel_id: int) -> None:
         """Clear initiative for a guild/channel."""
-        key = self.get_key(guild_id, channel_id)
-        if key in self._initiatives:
-            self._initiatives[key].reset()
+        initiative = self.find_initiative(guild_id, channel_id)
+        if initiative is not None:
+            initiative.reset()
 
     def remove_initiative(self, guild_id: int, channel_id: int) -> None:
         """Remove initiative for a guild/channel."""
-        key = self.get_key(guild_id, channel_id)
-        if key in self._initiatives:
-            del self._initiatives[key]
+        state = self._channels.get(pack_key(guild_id, channel_id))
+        if state is not None and state.initiative is not None:
+            self.stats.initiative_removed(state.initiative)
+            state.initiative = None
+
+    def roster_key(self, guild_id: int, roster_name: str) -> tuple[int, str]:
+        """Get the key of a guild-level shared roster."""
+        return (guild_id, f"{ROSTER_KEY_PREFIX}{roster_name}")
+
+    def _drop_channel_state(self, guild_id: int, channel_id: int) -> None:
+        """Delete every structure held for a guild/channel."""
+        key = pack_key(guild_id, channel_id)
+        self._release_roster(guild_id, channel_id)
+        self.unlink_voice(guild_id, channel_id)
+        # A deleted voice channel can no longer drive any pools
+        for follower_id in self._voice_followers.pop(key, ()):
+            self._voice_links.pop(pack_key(guild_id, follower_id), None)
+        state = self._channels.pop(key, None)
+        if state is not None:
+            self.stats.record_removed(state)
+        self._thread_parents.pop(key, None)
+
+    def purge_channel(self, guild_id: int, channel_id: int) -> bool:
+        """
+        Remove all state for a deleted channel or thread.
+
+        Returns:
+            bool: True if the channel held any state
+        """
+        channels = self._guild_channels.get(guild_id)
+        if not channels or channel_id not in channels:
+            return False
+        channels.discard(channel_id)
+        if not channels:
+            del self._guild_channels[guild_id]
+        self._drop_channel_state(guild_id, channel_id)
+        return True
+
+    def purge_guild(self, guild_id: int) -> int:
+        """
+        Remove all state for a guild the bot has left.
+
+        Runs in time proportional to the guild's own channels via the
+        guild index rather than scanning every key.
+
+        Returns:
+            int: Number of channels purged
+        """
+        channels = self._guild_channels.pop(guild_id, None)
+        if not channels:
+            return 0
+        for channel_id in channels:
+            self._drop_channel_state(guild_id, channel_id)
+        # Unbinding the last channel deletes a roster, so normally none are
+        # left; drop any that are regardless
+        for roster_id in self._guild_rosters.pop(guild_id, ()):
+            self._drop_roster((guild_id, roster_id))
+        return len(channels)
+
+    def register_thread(self, guild_id: int, thread_id: int, parent_id: int) -> None:
+        """Record a thread's parent channel so the thread can inherit its pool."""
+        key = pack_key(guild_id, thread_id)
+        if self._thread_parents.get(key) != parent_id:
+            self._thread_parents[key] = parent_id
+            self._channel_state(guild_id, thread_id).pool_version = next_version()
+
+    def _pool_state(self, guild_id: int, channel_id: int, create: bool = False) -> Optional[ChannelState]:
+        """
+        Resolve the record whose pool a channel reads: its bound roster, its
+        own pool, or its parent channel's if it is an inheriting thread.
+
+        Without ``create`` this is None if that record does not exist yet.
+        """
+        key = pack_key(guild_id, channel_id)
+        roster_name = self._roster_bindings.get(key)
+        if roster_name is not None:
+            return self._rosters.get(self.roster_key(guild_id, roster_name))
+        state = self._channels.get(key)
+        if state is not None and state.pool is not None:
+            return state
+        parent_id = self._thread_parents.get(key)
+        if parent_id is not None:
+            return self._pool_state(guild_id, parent_id, create)
+        if state is None and create:
+            state = self._channel_state(guild_id, channel_id)
+        return state
+
+    def get_roster_binding(self, guild_id: int, channel_id: int) -> Optional[str]:
+        """Get the name of the shared roster a channel is bound to."""
+        return self._roster_bindings.get(pack_key(guild_id, channel_id))
+
+    def bind_roster(self, guild_id: int, channel_id: int, roster_name: str) -> Tuple[int, int]:
+        """
+        Bind a channel to a guild-level shared roster.
+
+        The channel then reads and writes the roster by reference, so changes
+        from any bound channel are seen by all of them. If the roster does not
+        exist yet it is created by moving the channel's own pool into it;
+        otherwise the channel's own pool is discarded.
+
+        Returns:
+            Tuple of (players in the roster, players discarded from the
+            channel's own pool)
+        """
+        key = pack_key(guild_id, channel_id)
+        if self._roster_bindings.get(key) == roster_name:
+            return len(self.get_player_pool(guild_id, channel_id)), 0
+        self._release_roster(guild_id, channel_id)
+
+        roster = self.roster_key(guild_id, roster_name)
+        state = self._channel_state(guild_id, channel_id)
+        own_pool, own_index = state.pool, state.names
+        self.stats.record_changing(state)
+        state.pool = state.names = None
+        roster_state = self._rosters.get(roster)
+        discarded = 0
+        if roster_state is None:
+            roster_state = self._rosters[roster] = ChannelState(roster)
+            self.stats.record_added(roster_state)
+            self.stats.record_changing(roster_state)
+            roster_state.pool = own_pool if own_pool is not None else set()
+            roster_state.names = own_index if own_index is not None else NameIndex()
+            roster_state.pool_version = next_version()
+            rosters = self._guild_rosters.get(guild_id)
+            if rosters is None:
+                rosters = self._guild_rosters[guild_id] = set()
+            rosters.add(roster[1])
+        elif own_pool is not None:
+            discarded = len(own_pool)
+
+        self._roster_bindings[key] = roster_name
+        self._roster_refcounts[roster] = self._roster_refcounts.get(roster, 0) + 1
+        state.pool_version = next_version()
+        return len(roster_state.pool), discarded
+
+    def unbind_roster(self, guild_id: int, channel_id: int) -> bool:
+        """
+        Unbind a channel from its shared roster, giving it a private copy.
+
+        Returns:
+            bool: True if the channel was bound
+        """
+        key = pack_key(guild_id, channel_id)
+        if key not in self._roster_bindings:
+            return False
+        roster_state = self._pool_state(guild_id, channel_id)
+        pool = roster_state.pool if roster_state is not None else None
+        index = roster_state.names if roster_state is not None else None
+        state = self._channel_state(guild_id, channel_id)
+        self.stats.record_changing(state)
+        state.pool = pool.copy() if pool else set()
+        state.names = index.copy() if index else NameIndex()
+        state.pool_version = next_version()
+        self._release_roster(guild_id, channel_id)
+        return True
+
+    def _release_roster(self, guild_id: int, channel_id: int) -> None:
+        """
+        Drop a channel's roster binding and its reference count, deleting
+        the roster once no channel is bound to it.
+        """
+        roster_name = self._roster_bindings.pop(pack_key(guild_id, channel_id), None)
+        if roster_name is None:
+            return
+        roster = self.roster_key(guild_id, roster_name)
+        remaining = self._roster_refcounts.get(roster, 1) - 1
+        if remaining > 0:
+            self._roster_refcounts[roster] = remaining
+        else:
+            self._drop_roster(roster)
+            rosters = self._guild_rosters.get(guild_id)
+            if rosters is not None:
+                rosters.discard(roster[1])
+                if not rosters:
+                    del self._guild_rosters[guild_id]
+
+    def _drop_roster(self, roster: tuple[int, str]) -> None:
+        """Delete a roster's record and reference count."""
+        self._roster_refcounts.pop(roster, None)
+        roster_state = self._rosters.pop(roster, None)
+        if roster_state is not None:
+            self.stats.record_removed(roster_state)
+
+    def list_rosters(self, guild_id: int) -> List[Tuple[str, int, int]]:
+        """
+        List a guild's shared rosters.
+
+        Returns:
+            List of (roster_name, player_count, bound_channel_count) tuples
+        """
+        rosters = []
+        for roster_id in self._guild_rosters.get(guild_id, ()):
+            key = (guild_id, roster_id)
+            roster_state = self._rosters.get(key)
+            rosters.append((
+                roster_id[len(ROSTER_KEY_PREFIX):],
+                len(roster_state.pool) if roster_state is not None and roster_state.pool else 0,
+                self._roster_refcounts.get(key, 0),
+            ))
+        return sorted(rosters)
+
+    def link_voice(self, guild_id: int, channel_id: int, voice_channel_id: int) -> None:
+        """Keep a channel's pool in sync with a voice channel's members."""
+        self.unlink_voice(guild_id, channel_id)
+        self._voice_links[pack_key(guild_id, channel_id)] = voice_channel_id
+        voice_key = pack_key(guild_id, voice_channel_id)
+        followers = self._voice_followers.get(voice_key)
+        if followers is None:
+            followers = self._voice_followers[voice_key] = set()
+        followers.add(channel_id)
+        self._track_channel(guild_id, channel_id)
+        self._track_channel(guild_id, voice_channel_id)
+
+    def unlink_voice(self, guild_id: int, channel_id: int) -> bool:
+        """
+        Stop syncing a channel's pool with a voice channel. The pool keeps
+        its current members.
+
+        Returns:
+            bool: True if the channel was linked
+        """
+        voice_channel_id = self._voice_links.pop(pack_key(guild_id, channel_id), None)
+        if voice_channel_id is None:
+            return False
+        voice_key = pack_key(guild_id, voice_channel_id)
+        followers = self._voice_followers.get(voice_key)
+        if followers is not None:
+            followers.discard(channel_id)
+            if not followers:
+                del self._voice_followers[voice_key]
+        return True
+
+    def get_voice_link(self, guild_id: int, channel_id: int) -> Optional[int]:
+        """Get the voice channel a channel's pool is synced with."""
+        return self._voice_links.get(pack_key(guild_id, channel_id))
+
+    def get_voice_followers(self, guild_id: int, voice_channel_id: int) -> Tuple[int, ...]:
+        """Get the channels whose pools are synced with a voice channel."""
+        return tuple(self._voice_followers.get(pack_key(guild_id, voice_channel_id), ()))
+
+    def voice_member_joined(
+        self, guild_id: int, channel_id: int, player_id: int, display_name: Optional[str] = None
+    ) -> None:
+        """
+        Add a player who joined a linked voice channel to the pool. They join
+        rounds from the next one, so a reconnecting player who already acted
+        does not get a second turn.
+        """
+        self.add_to_pool(guild_id, channel_id, player_id, display_name)
+        initiative = self.find_initiative(guild_id, channel_id)
+        if initiative is not None:
+            initiative.readmit_participant(player_id)
+
+    def voice_member_left(self, guild_id: int, channel_id: int, player_id: int) -> None:
+        """
+        Remove a player who left a linked voice channel from the pool and the
+        current round. Leaving is not a turn, so undo does not reverse it.
+        """
+        self.remove_from_pool(guild_id, channel_id, player_id)
+        initiative = self.find_initiative(guild_id, channel_id)
+        if initiative is not None:
+            initiative.withdraw_participant(player_id)
+
+    def get_pool_source(self, guild_id: int, channel_id: int) -> str:
+        """
+        Describe where a channel's pool comes from.
+
+        Returns:
+            str: "roster" for a channel bound to a shared roster, "inherited"
+            for a thread reading its parent's pool, "forked" for a thread with
+            its own copy, or "channel" otherwise
+        """
+        key = pack_key(guild_id, channel_id)
+        if key in self._roster_bindings:
+            return "roster"
+        if key not in self._thread_parents:
+            return "channel"
+        state = self._channels.get(key)
+        return "forked" if state is not None and state.pool is not None else "inherited"
+
+    def get_thread_parent(self, guild_id: int, channel_id: int) -> Optional[int]:
+        """Get the parent channel ID of a registered thread."""
+        return self._thread_parents.get(pack_key(guild_id, channel_id))
 
     def get_player_pool(self, guild_id: int, channel_id: int) -> Set[int]:
-        """Get player pool for a guild/channel."""
-        key = self.get_key(guild_id, channel_id)
-        if key not in self._player_pools:
-            self._player_pools[key] = set()
-        return self._player_pools[key]
-
-    def add_to_pool(self, guild_id: int, channel_id: int, player_id: int) -> None:
-        """Add player to pool."""
-        pool = self.get_player_pool(guild_id, channel_id)
-        pool.add(player_id)
+        """
+        Get player pool for a guild/channel.
+
+        For a thread that has not modified its pool this is the parent
+        channel's pool, and for a channel bound to a shared roster it is the
+        roster, both shared by reference; mutate pools only through
+        add_to_pool/remove_from_pool/clear_pool so threads fork first.
+        """
+        state = self._pool_state(guild_id, channel_id, create=True)
+        if state.pool is None:
+            self.stats.record_changing(state)
+            state.pool = set()
+        return state.pool
+
+    def find_player_pool(self, guild_id: int, channel_id: int) -> Tuple[AbstractSet[int], Optional[NameIndex]]:
+        """
+        Get the pool a guild/channel reads and its name index without
+        creating either; the pool is empty if the channel has none.
+        """
+        state = self._pool_state(guild_id, channel_id)
+        if state is None:
+            return EMPTY_POOL, None
+        return (state.pool if state.pool is not None else EMPTY_POOL), state.names
+
+    def get_name_index(self, guild_id: int, channel_id: int) -> NameIndex:
+        """Get the display name index of the pool for a guild/channel."""
+        state = self._pool_state(guild_id, channel_id, create=True)
+        if state.names is None:
+            self.stats.record_changing(state)
+            state.names = NameIndex()
+        return state.names
+
+    def _fork_pool(self, guild_id: int, channel_id: int, copy: bool = True) -> None:
+        """Give an inheriting thread its own pool before the first modification."""
+        key = pack_key(guild_id, channel_id)
+        state = self._channels.get(key)
+        if state is not None and state.pool is not None:
+            return
+        if key in self._roster_bindings or key not in self._thread_parents:
+            return
+        parent = self._pool_state(guild_id, channel_id)
+        parent_pool = parent.pool if parent is not None else None
+        parent_index = parent.names if parent is not None else None
+        state = self._channel_state(guild_id, channel_id)
+        self.stats.record_changing(state)
+        state.pool = parent_pool.copy() if copy and parent_pool else set()
+        state.names = parent_index.copy() if copy and parent_index else NameIndex()
+
+    def _writable_pool_state(self, guild_id: int, channel_id: int) -> ChannelState:
+        """
+        Get the record a guild/channel's pool changes go to, with its pool
+        and name index created, after forking an inheriting thread's pool.
+        The record is reported to the running stats as about to change.
+        """
+        self._fork_pool(guild_id, channel_id)
+        state = self._pool_state(guild_id, channel_id, create=True)
+        self.stats.record_changing(state)
+        if state.pool is None:
+            state.pool = set()
+        if state.names is None:
+            state.names = NameIndex()
+        return state
+
+    def get_state_version(self, guild_id: int, channel_id: int) -> int:
+        """
+        Get the version of a channel's pool and initiative state.
+
+        Versions come from a global monotonic clock, so any change to the
+        channel's initiative or to the pool it reads yields a larger value.
+        """
+        state = self._channels.get(pack_key(guild_id, channel_id))
+        pool_state = self._pool_state(guild_id, channel_id)
+        version = pool_state.pool_version if pool_state is not None else 0
+        if state is not None:
+            version = max(version, state.pool_version)
+            if state.initiative is not None:
+                version = max(version, state.initiative.version)
+        return version
+
+    def state_digest(self, guild_id: int, channel_id: int) -> str:
+        """
+        Get a short digest of a channel's pool and initiative contents.
+
+        Unlike the state version this depends only on the contents, so two
+        runs that reach the same state produce the same digest.
+        """
+        initiative = self.find_initiative(guild_id, channel_id) or Initiative()
+        pool, _ = self.find_player_pool(guild_id, channel_id)
+        state = (
+            initiative.current_player_id,
+            sorted(initiative.participants),
+            list(initiative.history),
+            sorted(pool),
+            sorted(initiative.weights.items()),
+            sorted(initiative.sides.items()),
+            initiative.turn_policy,
+        )
+        return hashlib.blake2b(repr(state).encode(), digest_size=8).hexdigest()
+
+    def add_to_pool(
+        self, guild_id: int, channel_id: int, player_id: int, display_name: Optional[str] = None
+    ) -> None:
+        """Add player to pool, indexing their display name for autocomplete."""
+        state = self._writable_pool_state(guild_id, channel_id)
+        state.pool.add(player_id)
+        state.names.add(player_id, display_name or str(player_id))
+        state.pool_version = next_version()
 
     def remove_from_pool(self, guild_id: int, channel_id: int, player_id: int) -> None:
         """Remove player from pool."""
-        pool = self.get_player_pool(guild_id, channel_id)
-        pool.discard(player_id)
+        state = self._writable_pool_state(guild_id, channel_id)
+        state.pool.discard(player_id)
+        state.names.remove(player_id)
+        state.pool_version = next_version()
 
     def clear_pool(self, guild_id: int, channel_id: int) -> None:
         """Clear player pool for a guild/channel."""
-        key = self.get_key(guild_id, channel_id)
-        if key in self._player_pools:
-            self._player_pools[key].clear()
+        self._fork_pool(guild_id, channel_id, copy=False)
+        state = self._pool_state(guild_id, channel_id, create=True)
+        self.stats.record_changing(state)
+        if state.pool is not None:
+            state.pool.clear()
+        if state.names is not None:
+            state.names.clear()
+        state.pool_version = next_version()
+
+    def search_pool(
+        self, guild_id: int, channel_id: int, prefix: str, limit: int = 25
+    ) -> List[Tuple[int, str]]:
+        """Find pool members whose display name starts with prefix."""
+        state = self._pool_state(guild_id, channel_id)
+        if state is None or state.names is None:
+            return []
+        if not state.names.searchable:
+            # The first search builds the index's keys
+            self.stats.record_changing(state)
+        return state.names.search(prefix, limit)
+
+    def search_participants(
+        self, guild_id: int, channel_id: int, prefix: str, limit: int = 25
+    ) -> List[Tuple[int, str]]:
+        """Find remaining participants whose display name starts with prefix."""
+        initiative = self.find_initiative(guild_id, channel_id)
+        if initiative is None or not initiative.is_active() or initiative.participant_names is None:
+            return []
+        if not initiative.participant_names.searchable:
+            initiative._changing()
+        return initiative.participant_names.search(prefix, limit)
+
+    def rename_member(self, guild_id: int, player_id: int, display_name: str) -> int:
+        """
+        Refresh a member's display name in every pool and round of a guild.
+
+        Returns:
+            int: Number of channels and rosters whose names changed
+        """
+        records = itertools.chain(
+            (self._channels.get(pack_key(guild_id, channel_id))
+             for channel_id in self._guild_channels.get(guild_id, ())),
+            (self._rosters.get((guild_id, roster_id))
+             for roster_id in self._guild_rosters.get(guild_id, ())),
+        )
+        renamed = 0
+        for state in records:
+            if state is None:
+                continue
+            changed = False
+            if _renames(state.names, player_id, display_name):
+                self.stats.record_changing(state)
+                changed = state.names.rename(player_id, display_name)
+            initiative = state.initiative
+            if initiative is not None and _renames(initiative.participant_names, player_id, display_name):
+                initiative._changing()
+                changed = initiative.participant_names.rename(player_id, display_name)
+            if changed:
+                # Status renders are cached by version, so names need one too
+                state.pool_version = next_version()
+                renamed += 1
+        return renamed
+
+    def set_weight(self, guild_id: int, channel_id: int, player_id: int, weight: float) -> None:
+        """Set a player's selection weight for a guild/channel."""
+        self.get_initiative(guild_id, channel_id).set_weight(player_id, weight)
+
+    def set_side(self, guild_id: int, channel_id: int, player_id: int, side: Optional[str]) -> None:
+        """Assign a player to a side for a guild/channel; None unassigns them."""
+        self.get_initiative(guild_id, channel_id).set_side(player_id, side)
+
+    def set_turn_policy(self, guild_id: int, channel_id: int, policy: str) -> None:
+        """Set the turn policy for a guild/channel."""
+        self.get_initiative(guild_id, channel_id).set_turn_policy(policy)
 
     def initialize_initiative_from_pool(
         self, guild_id: int, channel_id: int, first_player_id: Optional[int] = None
     ) -> Optional[int]:
-        """Initialize initiative from pool. Returns the first player ID."""
+        """
+        Initialize initiative from pool. Returns the first player ID.
+
+        The pool (a shared roster for bound channels) is read in place; only
+        the round's own participant index is built from it.
+        """
         pool = self.get_player_pool(guild_id, channel_id)
         if not pool:
             return None
 
         initiative = self.get_initiative(guild_id, channel_id)
         
-        # Set participants from pool
-        initiative.participants = list(pool)
+        # Set participants from pool, named from the pool's name index
+        _, names = self.find_player_pool(guild_id, channel_id)
+        initiative.set_participants(pool, names)
         
         # Select first player
         if first_player_id and first_player_id in pool:
             player_id = first_player_id
         else:
-            player_id = random.choice(list(pool))
+            player_id = initiative.select_random_participant()
         
         initiative.set_current_player(player_id)
         return player_id
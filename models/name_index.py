@@ -0,0 +1,122 @@
+"""Prefix index over player display names for slash command autocomplete."""
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class NameIndex:
+    """Sorted index of display names supporting fast prefix lookups.
+
+    Entries are kept as ``(casefolded_name, player_id)`` tuples in a sorted
+    list, so a prefix query is a binary search followed by a scan over the
+    matching run only. The list is built in one sort on the first search
+    and kept up to date incrementally from then on; most pools are never
+    searched, and hold only the names by player ID.
+    """
+
+    __slots__ = ("_keys", "_names")
+
+    def __init__(self):
+        # Sorted search keys, or None until the first search
+        self._keys: Optional[List[Tuple[str, int]]] = None
+        self._names: Dict[int, str] = {}
+
+    @classmethod
+    def from_names(cls, entries: Iterable[Tuple[int, str]]) -> "NameIndex":
+        """Build an index from ``(player_id, display_name)`` pairs."""
+        index = cls()
+        index._names = dict(entries)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self._names
+
+    @property
+    def searchable(self) -> bool:
+        """Whether the search keys are built; otherwise the next search() builds them."""
+        return self._keys is not None
+
+    def get_name(self, player_id: int) -> Optional[str]:
+        """Get the indexed display name for a player."""
+        return self._names.get(player_id)
+
+    def add(self, player_id: int, display_name: str) -> None:
+        """Add a player, or update their display name if already indexed."""
+        current = self._names.get(player_id)
+        if current == display_name:
+            return
+        if self._keys is not None:
+            if current is not None:
+                self._discard_key(current, player_id)
+            insort(self._keys, (display_name.casefold(), player_id))
+        self._names[player_id] = display_name
+
+    def rename(self, player_id: int, display_name: str) -> bool:
+        """
+        Update the display name of an indexed player.
+
+        Returns:
+            bool: True if the player is indexed and their name changed
+        """
+        if player_id not in self._names or self._names[player_id] == display_name:
+            return False
+        self.add(player_id, display_name)
+        return True
+
+    def remove(self, player_id: int) -> None:
+        """Remove a player from the index."""
+        current = self._names.pop(player_id, None)
+        if current is not None and self._keys is not None:
+            self._discard_key(current, player_id)
+
+    def copy(self) -> "NameIndex":
+        """Return an independent copy of the index."""
+        other = NameIndex()
+        other._keys = list(self._keys) if self._keys is not None else None
+        other._names = dict(self._names)
+        return other
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._keys = None
+        self._names.clear()
+
+    def search(
+        self,
+        prefix: str,
+        limit: int = 25,
+        predicate: Optional[Callable[[int], bool]] = None
+    ) -> List[Tuple[int, str]]:
+        """
+        Find players whose display name starts with ``prefix``.
+
+        Args:
+            prefix: Case-insensitive name prefix (empty matches everyone)
+            limit: Maximum number of results
+            predicate: Optional filter applied to each matching player ID
+
+        Returns:
+            List of ``(player_id, display_name)`` tuples in name order
+        """
+        folded = prefix.casefold()
+        keys = self._keys
+        if keys is None:
+            keys = self._keys = sorted((name.casefold(), player_id) for player_id, name in self._names.items())
+        results: List[Tuple[int, str]] = []
+        i = bisect_left(keys, (folded,))
+        while i < len(keys) and len(results) < limit:
+            name, player_id = keys[i]
+            if not name.startswith(folded):
+                break
+            if predicate is None or predicate(player_id):
+                results.append((player_id, self._names[player_id]))
+            i += 1
+        return results
+
+    def _discard_key(self, display_name: str, player_id: int) -> None:
+        key = (display_name.casefold(), player_id)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
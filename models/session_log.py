@@ -0,0 +1,90 @@
+"""Append-only log of an initiative's turn events."""
+import time
+from typing import Iterator, List, Optional, Tuple
+
+# Events kept per channel before the oldest are dropped
+DEFAULT_SESSION_LOG_EVENTS = 10000
+
+# Event kinds
+EVENT_ROUND_START = "round_start"
+EVENT_TURN = "turn"
+EVENT_UNDO = "undo"
+EVENT_END = "end"
+# Export-only marker in place of events dropped by the size limit
+EVENT_TRUNCATED = "truncated"
+
+# (timestamp, round_number, turn_number, event, player_id)
+SessionEvent = Tuple[float, int, int, str, Optional[int]]
+
+
+class SessionLog:
+    """
+    Turn events of one channel's initiative, kept across rounds and resets.
+
+    Events are compact tuples in a list. Once more than ``max_events`` are
+    held the oldest half is dropped in one step, so appends stay amortized
+    O(1) and a channel's log is bounded. Every event keeps an absolute
+    sequence number, which lets iter_events() stream the log while new
+    events are appended or old ones trimmed.
+    """
+
+    __slots__ = ("max_events", "round_number", "turn_number", "_events", "_dropped")
+
+    def __init__(self, max_events: int = DEFAULT_SESSION_LOG_EVENTS):
+        self.max_events = max_events
+        self.round_number = 0
+        self.turn_number = 0
+        self._events: List[SessionEvent] = []
+        # Number of events trimmed from the front since the log was created
+        self._dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def dropped(self) -> int:
+        """Number of the oldest events trimmed to stay within max_events."""
+        return self._dropped
+
+    def _append(self, event: str, player_id: Optional[int]) -> None:
+        self._events.append((time.time(), self.round_number, self.turn_number, event, player_id))
+        if self.max_events > 0 and len(self._events) > self.max_events:
+            trim = len(self._events) - self.max_events // 2
+            del self._events[:trim]
+            self._dropped += trim
+
+    def round_started(self) -> None:
+        """Record the start of a new round."""
+        self.round_number += 1
+        self.turn_number = 0
+        self._append(EVENT_ROUND_START, None)
+
+    def turn_taken(self, player_id: int) -> None:
+        """Record that a player took a turn."""
+        self.turn_number += 1
+        self._append(EVENT_TURN, player_id)
+
+    def turn_undone(self, player_id: Optional[int]) -> None:
+        """Record that a player's turn was undone."""
+        self._append(EVENT_UNDO, player_id)
+
+    def ended(self) -> None:
+        """Record that the initiative ended or was cleared."""
+        self._append(EVENT_END, None)
+
+    def iter_events(self) -> Iterator[SessionEvent]:
+        """
+        Yield the events logged so far, oldest first.
+
+        Events appended after iteration starts are not included, and events
+        trimmed while iterating are skipped, so the generator may be resumed
+        across awaits without copying the log.
+        """
+        end = self._dropped + len(self._events)
+        sequence = self._dropped
+        while sequence < end:
+            if sequence < self._dropped:
+                sequence = self._dropped
+                continue
+            yield self._events[sequence - self._dropped]
+            sequence += 1
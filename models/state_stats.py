@@ -0,0 +1,316 @@
+"""Running size statistics of an InitiativeManager's state."""
+import sys
+from bisect import bisect_left, insort
+from itertools import chain, islice
+from operator import itemgetter
+from typing import TYPE_CHECKING, AbstractSet, Dict, Hashable, List, Optional, Set, Tuple
+
+from .channel_state import ChannelState, is_shared_empty
+from .indexed_set import IndexedSet
+from .name_index import NameIndex
+from .session_log import SessionLog
+
+if TYPE_CHECKING:
+    from .initiative import Initiative
+
+# Changed records and initiatives held before they are measured without
+# waiting for a read, so the pending set stays small when nobody reads
+STATS_FLUSH_PENDING = 256
+
+# Size of an empty tuple and of each item slot, for sizing tuples from their length
+_TUPLE_BYTES = sys.getsizeof(())
+_TUPLE_ITEM_BYTES = sys.getsizeof((None,)) - _TUPLE_BYTES
+
+# (pool size or None, pool bytes, name index bytes or None) of a record
+RecordContribution = Tuple[Optional[int], int, Optional[int]]
+# (initiative bytes, history length) of an initiative
+InitiativeContribution = Tuple[int, int]
+
+
+def owned_bytes(container) -> int:
+    """Shallow size of a container, or 0 for a shared empty sentinel."""
+    return 0 if is_shared_empty(container) else sys.getsizeof(container)
+
+
+def estimate_indexed_set_bytes(members: IndexedSet) -> int:
+    """Shallow size of an IndexedSet and its backing containers."""
+    if is_shared_empty(members):
+        return 0
+    return sys.getsizeof(members) + sys.getsizeof(members._items) + sys.getsizeof(members._positions)
+
+
+def estimate_session_log_bytes(session_log: SessionLog) -> int:
+    """Size of a session log, assuming its events are alike."""
+    size = sys.getsizeof(session_log) + sys.getsizeof(session_log._events)
+    if session_log._events:
+        size += len(session_log._events) * sys.getsizeof(session_log._events[0])
+    return size
+
+
+def estimate_initiative_bytes(initiative: "Initiative") -> int:
+    """Shallow size of an Initiative and the containers it owns."""
+    size = sys.getsizeof(initiative)
+    size += estimate_indexed_set_bytes(initiative.participants) + owned_bytes(initiative.history)
+    if initiative.participant_names is not None:
+        size += estimate_name_index_bytes(initiative.participant_names)
+    size += owned_bytes(initiative.weights) + owned_bytes(initiative.sides)
+    size += owned_bytes(initiative._side_members) + owned_bytes(initiative._side_weights)
+    for members in initiative._side_members.values():
+        size += estimate_indexed_set_bytes(members)
+    # Undo log deltas; participant sets and histories kept by round steps
+    # belong to earlier rounds and are not counted
+    # Every delta is a tuple, so its size follows from its length
+    steps = initiative._undo_log
+    size += owned_bytes(steps) + sum(map(sys.getsizeof, steps))
+    size += sum(map(len, steps)) * _TUPLE_BYTES + sum(map(len, chain.from_iterable(steps))) * _TUPLE_ITEM_BYTES
+    if initiative._withdrawn is not None:
+        size += sys.getsizeof(initiative._withdrawn)
+    size += estimate_session_log_bytes(initiative.session_log)
+    return size
+
+
+def estimate_pool_bytes(pool: AbstractSet[int]) -> int:
+    """Shallow size of a pool's set."""
+    return sys.getsizeof(pool)
+
+
+def estimate_record_bytes(key: int, state: ChannelState) -> int:
+    """Size of a channel's state record and its packed key."""
+    return sys.getsizeof(key) + sys.getsizeof(state)
+
+
+def estimate_name_index_bytes(index: NameIndex) -> int:
+    """Size of a name index including its key tuples and names."""
+    size = sys.getsizeof(index) + sys.getsizeof(index._names)
+    keys = index._keys
+    if keys is None:
+        return size
+    # Search keys are (casefolded name, player_id) pairs, built on the first search
+    size += sys.getsizeof(keys) + len(keys) * (_TUPLE_BYTES + 2 * _TUPLE_ITEM_BYTES)
+    return size + sum(map(sys.getsizeof, map(itemgetter(0), keys)))
+
+
+class SizeHistogram:
+    """
+    Number of containers of each size, so percentiles need no scan.
+
+    Distinct sizes are kept sorted; there are far fewer of them than
+    containers. Entries added with a key are also bucketed by size, which
+    lets largest() walk down from the biggest size instead of ranking
+    every container.
+    """
+
+    __slots__ = ("_counts", "_sizes", "_keys", "_total")
+
+    def __init__(self):
+        # Structure: {size: number of containers of that size}
+        self._counts: Dict[int, int] = {}
+        # Distinct sizes, ascending
+        self._sizes: List[int] = []
+        # Structure: {size: Set[key]} of the keyed entries
+        self._keys: Dict[int, Set[Hashable]] = {}
+        self._total = 0
+
+    def __len__(self) -> int:
+        return self._total
+
+    def add(self, size: int, key: Optional[Hashable] = None) -> None:
+        """Count a container of the given size."""
+        count = self._counts.get(size)
+        if count is None:
+            insort(self._sizes, size)
+            count = 0
+        self._counts[size] = count + 1
+        self._total += 1
+        if key is not None:
+            keys = self._keys.get(size)
+            if keys is None:
+                keys = self._keys[size] = set()
+            keys.add(key)
+
+    def remove(self, size: int, key: Optional[Hashable] = None) -> None:
+        """Uncount a container previously added with the same size and key."""
+        count = self._counts[size] - 1
+        if count:
+            self._counts[size] = count
+        else:
+            del self._counts[size]
+            del self._sizes[bisect_left(self._sizes, size)]
+        self._total -= 1
+        if key is not None:
+            keys = self._keys[size]
+            keys.discard(key)
+            if not keys:
+                del self._keys[size]
+
+    def percentiles(self) -> Dict[str, int]:
+        """Nearest-rank p50/p90/p99/max of the counted sizes."""
+        if not self._total:
+            return {"p50": 0, "p90": 0, "p99": 0, "max": 0}
+        last = self._total - 1
+        wanted = [("p50", min(last, self._total * 50 // 100)),
+                  ("p90", min(last, self._total * 90 // 100)),
+                  ("p99", min(last, self._total * 99 // 100))]
+        result = {}
+        seen = 0
+        for size in self._sizes:
+            seen += self._counts[size]
+            while wanted and wanted[0][1] < seen:
+                result[wanted.pop(0)[0]] = size
+            if not wanted:
+                break
+        result["max"] = self._sizes[-1]
+        return result
+
+    def largest(self, limit: int) -> List[Tuple[int, Hashable]]:
+        """Get up to ``limit`` (size, key) pairs of the largest keyed entries."""
+        result: List[Tuple[int, Hashable]] = []
+        for size in reversed(self._sizes):
+            if len(result) >= limit:
+                break
+            keys = self._keys.get(size)
+            if keys:
+                result.extend((size, key) for key in islice(keys, limit - len(result)))
+        return result
+
+
+class StateStats:
+    """
+    Running counts, byte estimates and size histograms of a manager's state.
+
+    The manager reports each record or initiative just before changing it;
+    the first report since the last flush stores what it contributed until
+    then, or that it was new. flush() measures only those and applies the
+    difference, so keeping the totals current costs time in proportion to
+    what changed, not to everything held. Pending changes are flushed on their own once
+    STATS_FLUSH_PENDING accumulate, and by readers before they read.
+    """
+
+    def __init__(self):
+        self.counts = {"initiatives": 0, "player_pools": 0, "name_indexes": 0}
+        self.bytes = {"channel_records": 0, "initiatives": 0, "player_pools": 0, "name_indexes": 0}
+        # Pool sizes of channels and rosters; channel pools are keyed by
+        # packed key for the largest-channel listing
+        self.pool_sizes = SizeHistogram()
+        self.history_sizes = SizeHistogram()
+        # Structure: {ChannelState: contribution before its first change since
+        # the last flush, or None for a record added since and not counted yet}
+        self._dirty_records: Dict[ChannelState, Optional[RecordContribution]] = {}
+        # Structure: {id(initiative): (initiative, contribution before its first
+        # change or None)}; keyed by identity since an Initiative compares by value
+        self._dirty_initiatives: Dict[int, Tuple["Initiative", Optional[InitiativeContribution]]] = {}
+
+    @property
+    def pending(self) -> int:
+        """Number of changed records and initiatives not measured yet."""
+        return len(self._dirty_records) + len(self._dirty_initiatives)
+
+    def _flush_if_full(self) -> None:
+        if self.pending >= STATS_FLUSH_PENDING:
+            self.flush()
+
+    @staticmethod
+    def _measure_record(state: ChannelState) -> RecordContribution:
+        pool, names = state.pool, state.names
+        return (
+            len(pool) if pool is not None else None,
+            estimate_pool_bytes(pool) if pool is not None else 0,
+            estimate_name_index_bytes(names) if names is not None else None,
+        )
+
+    @staticmethod
+    def _measure_initiative(initiative: "Initiative") -> InitiativeContribution:
+        return estimate_initiative_bytes(initiative), len(initiative.history)
+
+    def _apply_record(self, state: ChannelState, contribution: Optional[RecordContribution], sign: int) -> None:
+        if contribution is None:
+            return
+        pool_size, pool_bytes, names_bytes = contribution
+        if pool_size is not None:
+            # Only channel records are ranked; roster keys are tuples
+            key = state.key if isinstance(state.key, int) else None
+            if sign > 0:
+                self.pool_sizes.add(pool_size, key)
+            else:
+                self.pool_sizes.remove(pool_size, key)
+            self.counts["player_pools"] += sign
+            self.bytes["player_pools"] += sign * pool_bytes
+        if names_bytes is not None:
+            self.counts["name_indexes"] += sign
+            self.bytes["name_indexes"] += sign * names_bytes
+
+    def _apply_initiative(self, contribution: Optional[InitiativeContribution], sign: int) -> None:
+        if contribution is None:
+            return
+        initiative_bytes, history_size = contribution
+        if sign > 0:
+            self.history_sizes.add(history_size)
+        else:
+            self.history_sizes.remove(history_size)
+        self.counts["initiatives"] += sign
+        self.bytes["initiatives"] += sign * initiative_bytes
+
+    def record_added(self, state: ChannelState) -> None:
+        """Count a new record; its contents are measured on the next flush."""
+        if isinstance(state.key, int):
+            self.bytes["channel_records"] += estimate_record_bytes(state.key, state)
+        self._flush_if_full()
+        self._dirty_records[state] = None
+
+    def record_changing(self, state: ChannelState) -> None:
+        """Note that a record's pool or name index is about to change."""
+        if state not in self._dirty_records:
+            self._flush_if_full()
+            self._dirty_records[state] = self._measure_record(state)
+
+    def record_removed(self, state: ChannelState) -> None:
+        """Uncount a record that was dropped, including its initiative."""
+        if state in self._dirty_records:
+            contribution = self._dirty_records.pop(state)
+        else:
+            contribution = self._measure_record(state)
+        self._apply_record(state, contribution, -1)
+        if isinstance(state.key, int):
+            self.bytes["channel_records"] -= estimate_record_bytes(state.key, state)
+        if state.initiative is not None:
+            self.initiative_removed(state.initiative)
+
+    def initiative_added(self, initiative: "Initiative") -> None:
+        """Count a new initiative and have it report its changes here."""
+        initiative._stats = self
+        self._flush_if_full()
+        self._dirty_initiatives[id(initiative)] = (initiative, None)
+
+    def initiative_changing(self, initiative: "Initiative") -> None:
+        """Note that an initiative is about to change."""
+        if id(initiative) not in self._dirty_initiatives:
+            self._flush_if_full()
+            self._dirty_initiatives[id(initiative)] = (initiative, self._measure_initiative(initiative))
+
+    def initiative_removed(self, initiative: "Initiative") -> None:
+        """Uncount an initiative that was dropped."""
+        entry = self._dirty_initiatives.pop(id(initiative), None)
+        contribution = entry[1] if entry is not None else self._measure_initiative(initiative)
+        initiative._stats = None
+        self._apply_initiative(contribution, -1)
+
+    def flush(self, limit: Optional[int] = None) -> int:
+        """
+        Re-measure up to ``limit`` pending records and initiatives (all if
+        None) and apply their changes to the totals.
+
+        Returns:
+            int: Number still pending
+        """
+        remaining = limit if limit is not None else self.pending
+        while remaining > 0 and self._dirty_records:
+            state, before = self._dirty_records.popitem()
+            self._apply_record(state, before, -1)
+            self._apply_record(state, self._measure_record(state), 1)
+            remaining -= 1
+        while remaining > 0 and self._dirty_initiatives:
+            _, (initiative, before) = self._dirty_initiatives.popitem()
+            self._apply_initiative(before, -1)
+            self._apply_initiative(self._measure_initiative(initiative), 1)
+            remaining -= 1
+        return self.pending
@@ -0,0 +1,60 @@
+"""Bounded mapping whose entries expire a fixed time after they are set."""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Size-bounded cache with a single time-to-live for every entry.
+
+    Entries are kept in an OrderedDict in insertion order. Because every
+    entry lives for the same ``ttl``, that is also expiry order, so expired
+    entries are evicted from the front in amortized O(1) on each access and
+    the oldest entry is dropped when ``maxsize`` is exceeded. Setting an
+    existing key refreshes its expiry.
+    """
+
+    __slots__ = ("maxsize", "ttl", "_clock", "_entries")
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        self._evict(self._clock())
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._evict(self._clock())
+        return key in self._entries
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries from the front."""
+        entries = self._entries
+        while entries:
+            oldest = next(iter(entries))
+            if entries[oldest][0] > now:
+                break
+            del entries[oldest]
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Get a live entry's value."""
+        self._evict(self._clock())
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else default
+
+    def set(self, key: Hashable, value: Any = True) -> None:
+        """Set an entry, expiring ttl seconds from now."""
+        now = self._clock()
+        self._evict(now)
+        self._entries.pop(key, None)
+        self._entries[key] = (now + self.ttl, value)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
@@ -0,0 +1,20 @@
+"""Monitoring package."""
+from .trace import TRACE_FORMAT, TraceRecorder, traced, trace_state_change, set_recorder, get_recorder
+from .stats import StatsCollector
+from .watchdog import LoopWatchdog
+from .profiler import SamplingProfiler, ProfileResult, PROFILE_MODES, PROFILE_MAX_SECONDS
+
+__all__ = [
+    "TRACE_FORMAT",
+    "TraceRecorder",
+    "traced",
+    "trace_state_change",
+    "set_recorder",
+    "get_recorder",
+    "StatsCollector",
+    "LoopWatchdog",
+    "SamplingProfiler",
+    "ProfileResult",
+    "PROFILE_MODES",
+    "PROFILE_MAX_SECONDS",
+]
@@ -0,0 +1,186 @@
+"""On-demand sampling profiler for the event loop thread."""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from types import CodeType
+from typing import Iterator, List, Optional, Tuple
+
+from .trace import handler_command
+
+# "loop" samples everything the event loop thread runs, "handlers" only
+# samples taken while a /popcorn handler coroutine is on the stack
+PROFILE_MODES = ("loop", "handlers")
+
+# Longest profile a single request may ask for
+PROFILE_MAX_SECONDS = 60
+
+
+def _frame_label(code: CodeType) -> str:
+    """Render a code object as a flamegraph frame name."""
+    path = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    filename = "/".join(path[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class ProfileResult:
+    """Aggregated stacks from one profiling run."""
+
+    def __init__(
+        self,
+        mode: str,
+        duration: float,
+        interval: float,
+        samples: int,
+        stacks: Counter
+    ):
+        self.mode = mode
+        self.duration = duration
+        self.interval = interval
+        self.samples = samples
+        # Structure: {(command name or None, code objects root first): sample count}
+        self.stacks = stacks
+        self.kept = sum(stacks.values())
+        self.path: Optional[str] = None
+
+    def _labelled_stacks(self) -> Iterator[Tuple[List[str], int]]:
+        for (command, codes), count in self.stacks.items():
+            labels = [_frame_label(code) for code in codes]
+            if command is not None:
+                labels.insert(0, f"/popcorn {command}")
+            yield labels, count
+
+    def iter_collapsed(self) -> Iterator[str]:
+        """Yield collapsed-stack lines ("root;...;leaf count"), as read by flamegraph tools."""
+        for labels, count in self._labelled_stacks():
+            yield f"{';'.join(labels)} {count}\n"
+
+    def top_functions(self, limit: int = 15) -> List[Tuple[str, int, int]]:
+        """
+        Get the functions with the most samples.
+
+        Returns:
+            List[Tuple[str, int, int]]: (function, self samples, total samples),
+            by self samples; self counts samples where the function was running,
+            total also counts those where it was waiting on a callee
+        """
+        own = Counter()
+        total = Counter()
+        for labels, count in self._labelled_stacks():
+            own[labels[-1]] += count
+            for label in set(labels):
+                total[label] += count
+        return [(label, samples, total[label]) for label, samples in own.most_common(limit)]
+
+    def summary(self, limit: int = 15) -> str:
+        """Render a plain-text top functions table."""
+        scope = "/popcorn handlers" if self.mode == "handlers" else "the event loop"
+        lines = [
+            f"Profiled {scope} for {self.duration:.1f}s at {1 / self.interval:.0f} Hz: "
+            f"{self.kept} of {self.samples} samples kept"
+        ]
+        if self.kept:
+            lines.append(" self%  total%  function")
+            for label, own, total in self.top_functions(limit):
+                lines.append(f"{own * 100 / self.kept:6.1f}  {total * 100 / self.kept:6.1f}  {label}")
+        return "\n".join(lines)
+
+
+class SamplingProfiler:
+    """
+    Samples the event loop thread's stack for a fixed time on request.
+
+    While a profile runs, a daemon thread reads the loop thread's current
+    frame every ``interval`` seconds and counts identical stacks, so the
+    loop itself does no extra work. In "handlers" mode only samples with a
+    traced /popcorn handler on the stack are kept, rooted at the command.
+    Between profiles no thread or hook is installed, so it costs nothing.
+    """
+
+    def __init__(self, interval: float = 0.005, output_dir: Optional[str] = None):
+        self.interval = interval
+        self.output_dir = output_dir
+        self._running = False
+
+    def is_running(self) -> bool:
+        """Whether a profile is in progress."""
+        return self._running
+
+    async def profile(self, seconds: float, mode: str = "loop") -> ProfileResult:
+        """
+        Profile the event loop thread for a number of seconds.
+
+        Must be awaited on the loop to profile. The collapsed stacks are
+        written to ``output_dir`` if one is set (see ProfileResult.path).
+
+        Raises:
+            ValueError: If the mode or duration is invalid, or a profile is already running
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}'. Use one of: {', '.join(PROFILE_MODES)}.")
+        if not 0 < seconds <= PROFILE_MAX_SECONDS:
+            raise ValueError(f"Profile duration must be more than 0 and at most {PROFILE_MAX_SECONDS} seconds.")
+        if self._running:
+            raise ValueError("A profile is already running.")
+
+        self._running = True
+        try:
+            stacks = Counter()
+            samples = [0]
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=self._sample,
+                args=(threading.get_ident(), mode == "handlers", stacks, samples, stop),
+                name="sampling-profiler",
+                daemon=True
+            )
+            start = time.monotonic()
+            thread.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                stop.set()
+                await asyncio.to_thread(thread.join)
+            result = ProfileResult(mode, time.monotonic() - start, self.interval, samples[0], stacks)
+            if self.output_dir:
+                result.path = await asyncio.to_thread(self._write, result)
+            return result
+        finally:
+            self._running = False
+
+    def _sample(
+        self, thread_id: int, handlers_only: bool, stacks: Counter, samples: list, stop: threading.Event
+    ) -> None:
+        current_frames = sys._current_frames
+        while not stop.wait(self.interval):
+            frame = current_frames().get(thread_id)
+            if frame is None:
+                continue
+            samples[0] += 1
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            codes.reverse()
+
+            command = None
+            if handlers_only:
+                for depth, code in enumerate(codes):
+                    command = handler_command(code)
+                    if command is not None:
+                        codes = codes[depth:]
+                        break
+                else:
+                    continue
+            stacks[(command, tuple(codes))] += 1
+
+    def _write(self, result: ProfileResult) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        filename = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{result.mode}.collapsed"
+        path = os.path.join(self.output_dir, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(result.iter_collapsed())
+        return path
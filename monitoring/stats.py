@@ -0,0 +1,121 @@
+"""State size and memory diagnostics for the admin stats command and endpoint."""
+import asyncio
+import threading
+import time
+import tracemalloc
+from typing import List, Optional
+
+from helpers import InteractionDeduplicator, response_counters
+from models import InitiativeManager, unpack_key
+from models.state_stats import estimate_name_index_bytes, estimate_pool_bytes
+
+# Pending changes measured between yields to the event loop
+STATS_CHUNK_SIZE = 2000
+
+
+class StatsCollector:
+    """
+    Reports state statistics for an InitiativeManager without stalling the loop.
+
+    Counts, byte estimates and size histograms are kept current by the
+    manager's running StateStats as state changes, so collecting them only
+    measures records changed since the last read, in chunks of
+    STATS_CHUNK_SIZE with a yield to the event loop between chunks.
+    """
+
+    def __init__(
+        self,
+        initiative_manager: InitiativeManager,
+        deduplicator: Optional[InteractionDeduplicator] = None
+    ):
+        self.initiative_manager = initiative_manager
+        self.deduplicator = deduplicator
+        self._tracemalloc_baseline: Optional[tracemalloc.Snapshot] = None
+        # Snapshots are taken in worker threads; one diff at a time
+        self._tracemalloc_lock = threading.Lock()
+
+    def _roster_dedup_saved(self) -> int:
+        """
+        Bytes each extra channel bound to a roster would otherwise hold in
+        its own pool and name index. Rosters are few, so they are measured
+        on read.
+        """
+        manager = self.initiative_manager
+        saved = 0
+        for roster, state in manager._rosters.items():
+            bound_count = manager._roster_refcounts.get(roster, 0)
+            if state.pool is None or bound_count < 2:
+                continue
+            shared_bytes = estimate_pool_bytes(state.pool)
+            if state.names is not None:
+                shared_bytes += estimate_name_index_bytes(state.names)
+            saved += (bound_count - 1) * shared_bytes
+        return saved
+
+    async def get_stats(self, top_n: int = 10) -> dict:
+        """Get current statistics."""
+        manager = self.initiative_manager
+        running = manager.stats
+        started = time.perf_counter()
+        while running.flush(STATS_CHUNK_SIZE):
+            await asyncio.sleep(0)
+
+        # Rosters are not channels, so they show up under "rosters" rather
+        # than among the largest channels
+        largest = []
+        for size, key in running.pool_sizes.largest(top_n):
+            guild_id, channel_id = unpack_key(key)
+            largest.append({"guild_id": guild_id, "channel_id": channel_id, "pool_size": size})
+        return {
+            "keys": {
+                "channels": len(manager._channels),
+                **running.counts,
+                "guilds": len(manager._guild_channels),
+                "threads": len(manager._thread_parents),
+                "rosters": len(manager._roster_refcounts),
+                "roster_bindings": len(manager._roster_bindings),
+            },
+            "pool_size": running.pool_sizes.percentiles(),
+            "history_size": running.history_sizes.percentiles(),
+            "bytes": {**running.bytes, "roster_dedup_saved": self._roster_dedup_saved()},
+            "top_n": top_n,
+            "largest_channels": largest,
+            "dedup": self.deduplicator.counters() if self.deduplicator is not None else None,
+            "responses": response_counters(),
+            "collected_in_ms": round((time.perf_counter() - started) * 1000, 2),
+            "collected_at": time.time(),
+        }
+
+    def tracemalloc_diff(self, limit: int = 10) -> List[str]:
+        """
+        Take a tracemalloc snapshot and diff it against the previous one.
+
+        The first call starts tracing and records a baseline; tracing stays
+        on until stop_tracemalloc() since it slows every allocation.
+        Snapshots walk every traced block, so call this through
+        asyncio.to_thread() from the event loop.
+        """
+        with self._tracemalloc_lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracemalloc_baseline = tracemalloc.take_snapshot()
+                return ["tracemalloc started; request again for a diff against this baseline"]
+
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ))
+            lines = []
+            if self._tracemalloc_baseline is not None:
+                top = snapshot.compare_to(self._tracemalloc_baseline, "lineno")[:limit]
+                lines = [str(stat) for stat in top]
+            self._tracemalloc_baseline = snapshot
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"traced: current={current} bytes peak={peak} bytes")
+            return lines
+
+    def stop_tracemalloc(self) -> None:
+        """Stop tracing allocations and drop the baseline."""
+        with self._tracemalloc_lock:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._tracemalloc_baseline = None
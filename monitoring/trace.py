@@ -0,0 +1,223 @@
+"""Opt-in recording of /popcorn interactions for offline replay."""
+import functools
+import gzip
+import inspect
+import json
+import logging
+import os
+import queue
+import shutil
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from types import CodeType
+from typing import Any, Dict, Optional
+
+import discord
+
+from models import InitiativeManager, reset_random, seed_random
+from helpers import has_manager_role
+
+logger = logging.getLogger(__name__)
+
+# Arguments that are plumbing rather than command options
+_NON_OPTION_PARAMS = {"self", "interaction", "initiative_manager"}
+
+# Trace format written into every event as "f". Bump it whenever the same
+# commands and seeds would reach a different state, so replays can tell
+# older traces apart. Events without "f" are format 1.
+#   2: pools iterate in ascending player ID order (packed pools), which
+#      changes the participant order a round starts with and so who a
+#      seed draws
+#   3: pools are sets again and iterate in set order
+TRACE_FORMAT = 3
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    """Compress a rotated trace file."""
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class TraceRecorder:
+    """
+    Writes one compact JSON line per /popcorn interaction to a rotated file.
+
+    Handlers only put the line on a queue; a listener thread does the file
+    writes and the gzip of rotated files, so neither blocks the event loop.
+
+    Each event holds the command, guild/channel/user IDs, options, handler
+    duration, the RNG seed used for the command and the resulting channel
+    state version and digest, which is enough for benchmarks/replay_trace.py to
+    re-drive the same handlers and verify the final state.
+    """
+
+    def __init__(
+        self,
+        initiative_manager: InitiativeManager,
+        path: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5
+    ):
+        self.initiative_manager = initiative_manager
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+        file_handler.namer = lambda name: name + ".gz"
+        file_handler.rotator = _gzip_rotator
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        self._file_handler = file_handler
+
+        records = queue.SimpleQueue()
+        self._listener = QueueListener(records, file_handler)
+        self._listener.start()
+
+        # Dedicated logger so trace lines never reach the regular log handlers
+        self._trace_logger = logging.getLogger(f"popcorn.trace.{id(self)}")
+        self._trace_logger.setLevel(logging.INFO)
+        self._trace_logger.propagate = False
+        self._handler = QueueHandler(records)
+        self._trace_logger.addHandler(self._handler)
+
+    def record(self, event: dict) -> None:
+        """Append an event to the trace."""
+        self._trace_logger.info(json.dumps(event, separators=(",", ":")))
+
+    def close(self) -> None:
+        """Write out queued events and close the trace file."""
+        self._trace_logger.removeHandler(self._handler)
+        self._listener.stop()
+        self._file_handler.close()
+
+
+_recorder: Optional[TraceRecorder] = None
+
+# Structure: {handler code object: command name}, filled in at decoration time
+_handler_codes: Dict[CodeType, str] = {}
+
+
+def set_recorder(recorder: Optional[TraceRecorder]) -> None:
+    """Install (or with None, remove) the active trace recorder."""
+    global _recorder
+    _recorder = recorder
+
+
+def get_recorder() -> Optional[TraceRecorder]:
+    """Get the active trace recorder, if tracing is enabled."""
+    return _recorder
+
+
+def handler_command(code: CodeType) -> Optional[str]:
+    """Get the command name of a traced handler from its code object."""
+    return _handler_codes.get(code)
+
+
+def _option_value(value: Any) -> Any:
+    """Convert a command option to a JSON-friendly value."""
+    if isinstance(value, (discord.Member, discord.User, discord.abc.GuildChannel)):
+        return str(value.id)
+    return value
+
+
+def _build_event(
+    manager: InitiativeManager,
+    command_name: str,
+    started_at: float,
+    elapsed_ms: float,
+    guild_id: int,
+    channel_id: int,
+    user_id: int,
+    is_manager: bool,
+    options: dict,
+    seed: int
+) -> dict:
+    """Build a trace event, capturing the channel's resulting state."""
+    return {
+        "f": TRACE_FORMAT,
+        "ts": round(started_at, 3),
+        "cmd": command_name,
+        "g": guild_id,
+        "c": channel_id,
+        "p": manager.get_thread_parent(guild_id, channel_id),
+        "u": user_id,
+        "mgr": is_manager,
+        "opts": options,
+        "seed": seed,
+        "ms": round(elapsed_ms, 3),
+        "v": manager.get_state_version(guild_id, channel_id),
+        "d": manager.state_digest(guild_id, channel_id),
+    }
+
+
+def trace_state_change(
+    command_name: str, guild_id: int, channel_id: int, user_id: int, options: dict
+) -> None:
+    """
+    Record a state change that did not come from a slash command, such as a
+    voice-synced pool update, so replays see it in order. Call it right
+    after applying the change.
+    """
+    recorder = _recorder
+    if recorder is None:
+        return
+    try:
+        recorder.record(_build_event(
+            recorder.initiative_manager, command_name, time.time(), 0.0,
+            guild_id, channel_id, user_id, False, options, 0
+        ))
+    except Exception:
+        logger.exception(f"Failed to record trace event for {command_name}")
+
+
+def traced(command_name: str):
+    """
+    Decorator recording each call of a /popcorn handler when tracing is on.
+
+    The handler's signature is preserved so it can still be registered as
+    an app command. When no recorder is installed the wrapper only checks
+    a module global before calling through.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        _handler_codes[func.__code__] = command_name
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return await func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            interaction: discord.Interaction = bound.arguments["interaction"]
+            options = {
+                name: _option_value(value)
+                for name, value in bound.arguments.items()
+                if name not in _NON_OPTION_PARAMS and value is not None
+            }
+            # A random source of this call's own, so another command drawing
+            # while this one awaits cannot consume its seeded stream
+            seed = int.from_bytes(os.urandom(8), "big")
+            token = seed_random(seed)
+
+            started_at = time.time()
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                reset_random(token)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                try:
+                    recorder.record(_build_event(
+                        recorder.initiative_manager, command_name, started_at, elapsed_ms,
+                        interaction.guild.id, interaction.channel.id, interaction.user.id,
+                        has_manager_role(interaction.user), options, seed
+                    ))
+                except Exception:
+                    logger.exception(f"Failed to record trace event for {command_name}")
+
+        return wrapper
+    return decorator
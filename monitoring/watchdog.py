@@ -0,0 +1,109 @@
+"""Event loop lag watchdog."""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopWatchdog:
+    """
+    Samples event loop lag and reports stalls with a stack dump.
+
+    A coroutine on the loop sleeps for ``interval`` seconds at a time and
+    records how late it woke up; each wake-up is also a heartbeat. A daemon
+    thread checks the heartbeat, and when the loop has not beaten for longer
+    than ``threshold`` it logs the stack of the loop thread and the task it
+    is running, i.e. the code that is blocking the loop right now.
+    """
+
+    def __init__(self, interval: float = 0.5, threshold: float = 1.0, samples: int = 1200):
+        self.interval = interval
+        self.threshold = threshold
+        self._lags: deque = deque(maxlen=samples)
+        self._last_beat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stalls = 0
+
+    def start(self) -> None:
+        """Start sampling on the running loop and the monitor thread."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._sample(), name="loop-watchdog")
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._lags.append(lag)
+            self._last_beat = now
+            if lag > self.threshold:
+                logger.warning(f"Event loop lag of {lag:.3f}s exceeded {self.threshold:.3f}s")
+
+    def _monitor(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(self.interval):
+            last_beat = self._last_beat
+            stalled = time.monotonic() - last_beat
+            # Report each stall once, while it is still in progress
+            if stalled > self.interval + self.threshold and reported_beat != last_beat:
+                reported_beat = last_beat
+                self.stalls += 1
+                self._dump_loop_stack(stalled)
+
+    def _dump_loop_stack(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>\n"
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        task_name = task.get_name() if task is not None else "<no task>"
+        logger.warning(
+            f"Event loop blocked for {stalled:.3f}s in task {task_name}; loop thread stack:\n{stack}"
+        )
+
+    def seconds_since_heartbeat(self) -> float:
+        """Time since the loop last completed a sample."""
+        return time.monotonic() - self._last_beat
+
+    def is_alive(self) -> bool:
+        """Whether the loop is beating within the stall threshold."""
+        return self._task is not None and self.seconds_since_heartbeat() <= self.interval + self.threshold
+
+    def lag_percentiles(self) -> Dict[str, float]:
+        """Lag percentiles in seconds over the retained samples."""
+        values = sorted(self._lags)
+        if not values:
+            return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+        last = len(values) - 1
+        return {
+            "p50": round(values[min(last, len(values) * 50 // 100)], 4),
+            "p90": round(values[min(last, len(values) * 90 // 100)], 4),
+            "p99": round(values[min(last, len(values) * 99 // 100)], 4),
+            "max": round(values[last], 4),
+        }
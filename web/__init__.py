@@ -0,0 +1,12 @@
+"""Local HTTP endpoints package."""
+from .server import LocalHTTPServer
+from .status_feed import StatusFeed
+from .routes import setup_admin_routes, setup_health_routes, setup_status_routes
+
+__all__ = [
+    "LocalHTTPServer",
+    "StatusFeed",
+    "setup_admin_routes",
+    "setup_health_routes",
+    "setup_status_routes",
+]
@@ -0,0 +1,190 @@
+"""HTTP route handlers for the local operator server."""
+import asyncio
+import hmac
+from typing import AbstractSet, Callable, Dict
+
+from aiohttp import web
+
+from monitoring.profiler import PROFILE_MAX_SECONDS, SamplingProfiler
+from monitoring.stats import StatsCollector
+from monitoring.watchdog import LoopWatchdog
+from .server import Handler, LocalHTTPServer
+from .status_feed import StatusFeed
+
+# Seconds between comment lines that keep idle event streams open through proxies
+SSE_KEEPALIVE = 15.0
+
+
+def _flag(request: web.Request, name: str) -> bool:
+    """Read a boolean query parameter."""
+    return request.query.get(name, "").lower() in ("1", "true", "yes")
+
+
+def _require_token(token: str, handler: Handler) -> Handler:
+    """
+    Wrap a handler so it only runs for requests carrying the admin token as
+    ``Authorization: Bearer <token>``. A custom header cannot be sent by a
+    page on another origin without a CORS preflight, which admin routes
+    never allow.
+    """
+    expected = f"Bearer {token}".encode()
+
+    async def checked(request: web.Request) -> web.StreamResponse:
+        supplied = request.headers.get("Authorization", "").encode()
+        if not hmac.compare_digest(supplied, expected):
+            raise web.HTTPUnauthorized(text="Admin token required", headers={"WWW-Authenticate": "Bearer"})
+        return await handler(request)
+
+    return checked
+
+
+def setup_admin_routes(
+    server: LocalHTTPServer, stats_collector: StatsCollector, profiler: SamplingProfiler, token: str
+) -> None:
+    """Register the admin diagnostics endpoints, each requiring the admin token."""
+    if not token:
+        raise ValueError("Admin routes need a token")
+
+    async def admin_stats(request: web.Request) -> web.Response:
+        try:
+            top_n = int(request.query.get("top", "10"))
+        except ValueError:
+            raise web.HTTPBadRequest(text="top must be an integer")
+        body = await stats_collector.get_stats(top_n)
+        if _flag(request, "tracemalloc"):
+            body["tracemalloc"] = await asyncio.to_thread(stats_collector.tracemalloc_diff)
+        return web.json_response(body)
+
+    async def admin_tracemalloc_stop(request: web.Request) -> web.Response:
+        stats_collector.stop_tracemalloc()
+        return web.json_response({"tracemalloc": "stopped"})
+
+    async def admin_profile(request: web.Request) -> web.Response:
+        try:
+            seconds = float(request.query.get("seconds", "10"))
+            top_n = int(request.query.get("top", "15"))
+        except ValueError:
+            raise web.HTTPBadRequest(text="seconds and top must be numbers")
+        if profiler.is_running():
+            raise web.HTTPConflict(text="A profile is already running")
+        mode = "handlers" if _flag(request, "handlers") else "loop"
+        try:
+            result = await profiler.profile(min(seconds, PROFILE_MAX_SECONDS), mode)
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=str(e))
+        if _flag(request, "collapsed"):
+            return web.Response(text="".join(result.iter_collapsed()), content_type="text/plain")
+        return web.json_response({
+            "mode": result.mode,
+            "duration": round(result.duration, 3),
+            "samples": result.samples,
+            "kept": result.kept,
+            "path": result.path,
+            "top_functions": [
+                {"function": label, "self": own, "total": total}
+                for label, own, total in result.top_functions(top_n)
+            ],
+        })
+
+    server.add_get("/admin/stats", _require_token(token, admin_stats))
+    server.add_post("/admin/tracemalloc/stop", _require_token(token, admin_tracemalloc_stop))
+    server.add_post("/admin/profile", _require_token(token, admin_profile))
+
+
+def setup_health_routes(
+    server: LocalHTTPServer,
+    watchdog: LoopWatchdog,
+    readiness: Callable[[], Dict[str, bool]]
+) -> None:
+    """
+    Register liveness and readiness endpoints.
+
+    Liveness only asks whether the event loop is beating; readiness also
+    requires every check returned by ``readiness`` to pass.
+    """
+
+    async def healthz(request: web.Request) -> web.Response:
+        alive = watchdog.is_alive()
+        return web.json_response(
+            {
+                "alive": alive,
+                "seconds_since_heartbeat": round(watchdog.seconds_since_heartbeat(), 3),
+                "loop_lag": watchdog.lag_percentiles(),
+                "stalls": watchdog.stalls,
+            },
+            status=200 if alive else 503
+        )
+
+    async def readyz(request: web.Request) -> web.Response:
+        checks = dict(readiness(), event_loop=watchdog.is_alive())
+        ready = all(checks.values())
+        return web.json_response({"ready": ready, "checks": checks}, status=200 if ready else 503)
+
+    server.add_get("/healthz", healthz)
+    server.add_get("/readyz", readyz)
+
+
+def _channel_key(request: web.Request) -> tuple:
+    """Read the guild and channel IDs from the route."""
+    try:
+        return int(request.match_info["guild_id"]), int(request.match_info["channel_id"])
+    except ValueError:
+        raise web.HTTPBadRequest(text="guild_id and channel_id must be integers")
+
+
+def setup_status_routes(
+    server: LocalHTTPServer, status_feed: StatusFeed, allowed_origins: AbstractSet[str] = frozenset()
+) -> None:
+    """
+    Register the read-only channel status endpoints for stream overlays.
+
+    ``/status/{guild_id}/{channel_id}`` returns the status as JSON with an
+    ETag of the state version and honours If-None-Match;
+    ``/status/{guild_id}/{channel_id}/events`` is a Server-Sent Events
+    stream that sends the status again only when it changes.
+
+    The endpoints are unauthenticated, so browsers may only read them
+    cross-origin from pages in ``allowed_origins``; any other page the
+    operator has open gets no CORS headers.
+    """
+
+    def cors(request: web.Request) -> Dict[str, str]:
+        if not allowed_origins:
+            return {}
+        origin = request.headers.get("Origin")
+        if origin not in allowed_origins:
+            return {"Vary": "Origin"}
+        return {"Access-Control-Allow-Origin": origin, "Vary": "Origin"}
+
+    async def status(request: web.Request) -> web.Response:
+        guild_id, channel_id = _channel_key(request)
+        rendered = status_feed.render(guild_id, channel_id)
+        headers = dict(cors(request), ETag=rendered.etag, **{"Cache-Control": "no-cache"})
+        if rendered.etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=rendered.body, content_type="application/json", headers=headers)
+
+    async def status_events(request: web.Request) -> web.StreamResponse:
+        guild_id, channel_id = _channel_key(request)
+        try:
+            last_version = int(request.headers.get("Last-Event-ID", ""))
+        except ValueError:
+            last_version = None
+
+        response = web.StreamResponse(headers=dict(cors(request), **{
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+        }))
+        await response.prepare(request)
+        updates = status_feed.subscribe(guild_id, channel_id, last_version, SSE_KEEPALIVE)
+        try:
+            async for rendered in updates:
+                await response.write(rendered.event if rendered is not None else b": keepalive\n\n")
+        except ConnectionResetError:
+            pass
+        finally:
+            await updates.aclose()
+        return response
+
+    server.add_get("/status/{guild_id}/{channel_id}", status)
+    server.add_get("/status/{guild_id}/{channel_id}/events", status_events)
@@ -0,0 +1,47 @@
+"""Local HTTP server for operator endpoints."""
+import logging
+from typing import Awaitable, Callable, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+class LocalHTTPServer:
+    """
+    Small aiohttp server running on the bot's event loop.
+
+    Routes are registered before start(). The server binds to loopback by
+    default; endpoints are meant for operators and sidecars on the same
+    host, not for the public internet.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080):
+        self.host = host
+        self.port = port
+        self.app = web.Application()
+        self._runner: Optional[web.AppRunner] = None
+
+    def add_get(self, path: str, handler: Handler) -> None:
+        """Register a GET route."""
+        self.app.router.add_get(path, handler)
+
+    def add_post(self, path: str, handler: Handler) -> None:
+        """Register a POST route."""
+        self.app.router.add_post(path, handler)
+
+    async def start(self) -> None:
+        """Start serving."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logger.info(f"HTTP server listening on http://{self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        """Stop serving and release the socket."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,165 @@
+"""Per-channel initiative status rendering for the read-only status feed."""
+import asyncio
+import json
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from models import InitiativeManager, TTLCache, TURN_POLICY_ANY
+
+# Rendered channels kept in the cache, and how long an unwatched one stays
+STATUS_CACHE_ENTRIES = 1024
+STATUS_CACHE_TTL = 300.0
+
+
+class StatusRender:
+    """One rendered version of a channel's status."""
+
+    __slots__ = ("version", "body", "etag", "event")
+
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = f'"{version}"'
+        # Complete Server-Sent Events frame, encoded once for every subscriber
+        self.event = b"id: %d\nevent: status\ndata: %s\n\n" % (version, body)
+
+
+class StatusFeed:
+    """
+    Serves channel status snapshots rendered at most once per state version.
+
+    Renders are cached by channel and reused while the channel's state
+    version is unchanged, so any number of pollers and stream subscribers
+    cost one serialization per change. Streams are driven by a single
+    task that checks the state version of each watched channel every
+    ``poll_interval`` seconds, an O(1) lookup, and wakes the channel's
+    subscribers only when it changed.
+    """
+
+    def __init__(self, initiative_manager: InitiativeManager, poll_interval: float = 0.25):
+        self.initiative_manager = initiative_manager
+        self.poll_interval = poll_interval
+        self._renders = TTLCache(STATUS_CACHE_ENTRIES, STATUS_CACHE_TTL)
+        # Structure: {(guild_id, channel_id): number of stream subscribers}
+        self._watchers: Dict[Tuple[int, int], int] = {}
+        # Structure: {(guild_id, channel_id): event set on the next change}
+        self._changed: Dict[Tuple[int, int], asyncio.Event] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def render(self, guild_id: int, channel_id: int) -> StatusRender:
+        """Get the status of a channel at its current state version."""
+        manager = self.initiative_manager
+        key = (guild_id, channel_id)
+        version = manager.get_state_version(guild_id, channel_id)
+        cached = self._renders.get(key)
+        if cached is not None and cached.version == version:
+            return cached
+
+        initiative = manager.find_initiative(guild_id, channel_id)
+        pool, name_index = manager.find_player_pool(guild_id, channel_id)
+
+        def player(player_id: int) -> dict:
+            # IDs are strings since snowflakes exceed JavaScript's safe integers
+            name = name_index.get_name(player_id) if name_index is not None else None
+            return {"id": str(player_id), "name": name}
+
+        status = {
+            "guild_id": str(guild_id),
+            "channel_id": str(channel_id),
+            "version": version,
+            "active": False,
+            "current_player": None,
+            "remaining": [],
+            "acted": [],
+            "pool": [player(player_id) for player_id in pool],
+            "round": 0,
+            "turn": 0,
+            "turn_policy": TURN_POLICY_ANY,
+            "sides": {},
+        }
+        if initiative is not None:
+            status.update(
+                active=initiative.is_active(),
+                current_player=(
+                    player(initiative.current_player_id)
+                    if initiative.current_player_id is not None else None
+                ),
+                remaining=[player(player_id) for player_id in initiative.participants],
+                acted=[player(player_id) for player_id in initiative.history],
+                round=initiative.session_log.round_number,
+                turn=initiative.session_log.turn_number,
+                turn_policy=initiative.turn_policy,
+                sides={str(player_id): side for player_id, side in initiative.sides.items()},
+            )
+
+        rendered = StatusRender(version, json.dumps(status, separators=(",", ":")).encode("utf-8"))
+        self._renders.set(key, rendered)
+        return rendered
+
+    async def subscribe(
+        self,
+        guild_id: int,
+        channel_id: int,
+        last_version: Optional[int] = None,
+        keepalive: Optional[float] = None
+    ) -> AsyncIterator[Optional[StatusRender]]:
+        """
+        Yield a channel's status now and after every state change.
+
+        The current status is skipped if the subscriber already has it
+        (``last_version``, e.g. from a Last-Event-ID header on reconnect).
+        With ``keepalive`` set, None is yielded after that many seconds
+        without a change.
+        """
+        key = (guild_id, channel_id)
+        self._watchers[key] = self._watchers.get(key, 0) + 1
+        if key not in self._changed:
+            self._changed[key] = asyncio.Event()
+        try:
+            while not self._stopping:
+                changed = self._changed[key]
+                rendered = self.render(guild_id, channel_id)
+                if rendered.version != last_version:
+                    last_version = rendered.version
+                    yield rendered
+                try:
+                    await asyncio.wait_for(changed.wait(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            remaining = self._watchers[key] - 1
+            if remaining:
+                self._watchers[key] = remaining
+            else:
+                del self._watchers[key]
+                self._changed.pop(key, None)
+
+    def start(self) -> None:
+        """Start watching subscribed channels for changes."""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.get_running_loop().create_task(self._poll(), name="status-feed")
+
+    def stop(self) -> None:
+        """Stop watching and end every open stream."""
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for changed in self._changed.values():
+            changed.set()
+
+    async def _poll(self) -> None:
+        versions: Dict[Tuple[int, int], int] = {}
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for key in list(self._changed):
+                version = self.initiative_manager.get_state_version(*key)
+                if versions.get(key) != version:
+                    versions[key] = version
+                    # Swap in a fresh event first so woken subscribers wait on the next change
+                    changed = self._changed[key]
+                    self._changed[key] = asyncio.Event()
+                    changed.set()
+            for key in [key for key in versions if key not in self._changed]:
+                del versions[key]